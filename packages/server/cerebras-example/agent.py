@@ -3,6 +3,8 @@ import logging
 import os
 # import json
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
@@ -34,6 +36,13 @@ import time
 load_dotenv()
 logger = logging.getLogger("voice-assistant")
 
+# Pinecone's client is blocking, queries run on a bounded pool off the event loop
+PINECONE_QUERY_TIMEOUT = float(os.getenv('PINECONE_QUERY_TIMEOUT', '2.0'))
+_pinecone_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('PINECONE_QUERY_WORKERS', '8')),
+    thread_name_prefix="pinecone-query",
+)
+
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
 class PineconeRagAgent:
@@ -43,6 +52,14 @@ class PineconeRagAgent:
         self.embeddings_dimension = 1536
         self.cache = {}  # Simple in-memory cache
         
+    async def _query_index(self, **kwargs):
+        """Run ``self.index.query`` on the Pinecone pool, giving up after PINECONE_QUERY_TIMEOUT."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(_pinecone_executor, partial(self.index.query, **kwargs)),
+            timeout=PINECONE_QUERY_TIMEOUT,
+        )
+
     async def should_use_rag(self, query: str) -> bool:
         # List of keywords that indicate domain-specific knowledge is needed
         domain_keywords = [
@@ -67,7 +84,7 @@ class PineconeRagAgent:
                 dimensions=self.embeddings_dimension,
             )
 
-            query_response = self.index.query(
+            query_response = await self._query_index(
                 vector=user_embedding[0].embedding,
                 top_k=3,
                 include_metadata=True,
@@ -87,6 +104,9 @@ class PineconeRagAgent:
             self.cache[cache_key] = result
             return result
             
+        except asyncio.TimeoutError:
+            logger.warning(f"Pinecone query timed out after {PINECONE_QUERY_TIMEOUT}s")
+            return ''
         except Exception as e:
             logger.error(f"Error in query_knowledge: {str(e)}")
             return ''
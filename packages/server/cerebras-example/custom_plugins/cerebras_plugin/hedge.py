@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Literal, Union
+
+from livekit.agents import APIConnectionError, llm
+from livekit.agents.llm import ToolChoice
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions
+
+from .log import logger
+
+# hedging is the retry strategy, the outer stream must not retry on its own
+DEFAULT_HEDGED_API_CONNECT_OPTIONS = APIConnectOptions(
+    max_retry=0, timeout=DEFAULT_API_CONNECT_OPTIONS.timeout
+)
+
+
+class HedgedLLM(llm.LLM):
+    def __init__(
+        self,
+        primary: llm.LLM,
+        secondary: llm.LLM,
+        *,
+        hedge_after: float = 0.5,
+    ) -> None:
+        """
+        Send each turn to ``primary`` and, if it hasn't produced a first chunk within
+        ``hedge_after`` seconds, fire the same request at ``secondary``.
+
+        Whichever provider answers first is streamed, the other request is cancelled.
+        A primary that fails before its first chunk hedges immediately.
+        """
+        super().__init__(capabilities=primary.capabilities)
+        self._primary = primary
+        self._secondary = secondary
+        self._hedge_after = hedge_after
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        conn_options: APIConnectOptions = DEFAULT_HEDGED_API_CONNECT_OPTIONS,
+        fnc_ctx: llm.FunctionContext | None = None,
+        temperature: float | None = None,
+        n: int | None = 1,
+        parallel_tool_calls: bool | None = None,
+        tool_choice: Union[ToolChoice, Literal["auto", "required", "none"]]
+        | None = None,
+    ) -> "HedgedLLMStream":
+        return HedgedLLMStream(
+            self,
+            chat_ctx=chat_ctx,
+            fnc_ctx=fnc_ctx,
+            conn_options=conn_options,
+            temperature=temperature,
+            n=n,
+            parallel_tool_calls=parallel_tool_calls,
+            tool_choice=tool_choice,
+        )
+
+
+class HedgedLLMStream(llm.LLMStream):
+    def __init__(
+        self,
+        llm: HedgedLLM,
+        *,
+        chat_ctx: llm.ChatContext,
+        fnc_ctx: llm.FunctionContext | None,
+        conn_options: APIConnectOptions,
+        temperature: float | None,
+        n: int | None,
+        parallel_tool_calls: bool | None,
+        tool_choice: Union[ToolChoice, Literal["auto", "required", "none"]] | None,
+    ) -> None:
+        super().__init__(
+            llm, chat_ctx=chat_ctx, fnc_ctx=fnc_ctx, conn_options=conn_options
+        )
+        self._hedged = llm
+        self._temperature = temperature
+        self._n = n
+        self._parallel_tool_calls = parallel_tool_calls
+        self._tool_choice = tool_choice
+
+        self._current_stream: llm.LLMStream | None = None
+
+    @property
+    def function_calls(self) -> list[llm.FunctionCallInfo]:
+        if self._current_stream is None:
+            return []
+        return self._current_stream.function_calls
+
+    def execute_functions(self) -> list[llm.CalledFunction]:
+        if self._current_stream is None:
+            return []
+        return self._current_stream.execute_functions()
+
+    def _start(self, target: llm.LLM) -> llm.LLMStream:
+        return target.chat(
+            chat_ctx=self._chat_ctx,
+            fnc_ctx=self._fnc_ctx,
+            conn_options=self._conn_options,
+            temperature=self._temperature,
+            n=self._n,
+            parallel_tool_calls=self._parallel_tool_calls,
+            tool_choice=self._tool_choice,
+        )
+
+    async def _run(self) -> None:
+        streams: list[llm.LLMStream] = []
+        pending: dict[asyncio.Task[llm.ChatChunk | None], llm.LLMStream] = {}
+
+        def _launch(target: llm.LLM) -> None:
+            stream = self._start(target)
+            streams.append(stream)
+            pending[asyncio.create_task(_first_chunk(stream))] = stream
+
+        try:
+            _launch(self._hedged._primary)
+            hedged = False
+            winner: llm.LLMStream | None = None
+            first_chunk: llm.ChatChunk | None = None
+
+            while pending and winner is None:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=None if hedged else self._hedged._hedge_after,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logger.info(
+                        f"{self._hedged._primary.label} had no first chunk after "
+                        f"{self._hedged._hedge_after}s, hedging to {self._hedged._secondary.label}"
+                    )
+                    hedged = True
+                    _launch(self._hedged._secondary)
+                    continue
+
+                for task in done:
+                    stream = pending.pop(task)
+                    if task.exception() is None and task.result() is not None:
+                        winner, first_chunk = stream, task.result()
+                        break
+
+                    logger.warning(
+                        f"{stream._llm.label} failed before its first chunk",
+                        exc_info=task.exception(),
+                    )
+                    if not hedged:
+                        hedged = True
+                        _launch(self._hedged._secondary)
+
+            if winner is None or first_chunk is None:
+                raise APIConnectionError("all hedged LLMs failed")
+
+            for task in pending:
+                task.cancel()
+
+            self._current_stream = winner
+            self._event_ch.send_nowait(first_chunk)
+            async for chunk in winner:
+                self._event_ch.send_nowait(chunk)
+        finally:
+            for task in pending:
+                task.cancel()
+            for stream in streams:
+                await stream.aclose()
+
+
+async def _first_chunk(stream: llm.LLMStream) -> llm.ChatChunk | None:
+    async for chunk in stream:
+        return chunk
+    return None
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import os
+
+import httpx
+from cerebras.cloud.sdk import AsyncCerebras
+
+from .log import logger
+
+# how often idle connections are exercised, must stay below keepalive_expiry
+KEEPALIVE_INTERVAL = 30.0
+
+_clients: dict[tuple[str, str | None], AsyncCerebras] = {}
+_keepalive_tasks: dict[tuple[str, str | None], asyncio.Task[None]] = {}
+
+
+def get_client(
+    *, api_key: str | None = None, base_url: str | None = None
+) -> AsyncCerebras:
+    """
+    Return the process-wide ``AsyncCerebras`` client for ``api_key`` and ``base_url``.
+
+    Every ``LLM`` in the process shares the client and its connection pool. When called
+    from a running event loop, a keepalive task keeps the pooled connections hot.
+    """
+    api_key = api_key or os.environ.get("CEREBRAS_API_KEY")
+    if api_key is None:
+        raise ValueError("Cerebras API key is required")
+
+    key = (api_key, base_url)
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = AsyncCerebras(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=2,
+            http_client=httpx.AsyncClient(
+                timeout=httpx.Timeout(60.0, read=30.0, write=30.0, connect=5.0),
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=50,
+                    max_keepalive_connections=50,
+                    keepalive_expiry=120,
+                ),
+            ),
+            # the SDK warms a throwaway sync client, the keepalive task warms this pool
+            warm_tcp_connection=False,
+        )
+
+    _ensure_keepalive(key, client)
+    return client
+
+
+def prewarm_client(
+    *, api_key: str | None = None, base_url: str | None = None
+) -> AsyncCerebras:
+    """Create the shared client ahead of the first job, meant to be called from ``prewarm``."""
+    client = get_client(api_key=api_key, base_url=base_url)
+    logger.info("Cerebras client prewarmed")
+    return client
+
+
+async def aclose_clients() -> None:
+    """Stop the keepalive tasks and close the shared clients, e.g. on job or worker shutdown.
+
+    The next ``get_client`` creates a fresh client.
+    """
+    tasks = list(_keepalive_tasks.values())
+    clients = list(_clients.values())
+    _keepalive_tasks.clear()
+    _clients.clear()
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for client in clients:
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug(f"Error closing Cerebras client: {str(e)}")
+
+
+def _ensure_keepalive(key: tuple[str, str | None], client: AsyncCerebras) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # not in a job yet (e.g. prewarm), started on the first call from a job
+
+    task = _keepalive_tasks.get(key)
+    if task is not None and not task.done() and task.get_loop() is loop:
+        return
+
+    _keepalive_tasks[key] = loop.create_task(
+        _keepalive(client), name="cerebras_keepalive"
+    )
+
+
+async def _keepalive(client: AsyncCerebras) -> None:
+    # the first round trip opens the connection before the first turn needs it
+    while True:
+        try:
+            await client.models.list()
+        except Exception as e:
+            logger.debug(f"Cerebras keepalive failed: {str(e)}")
+
+        await asyncio.sleep(KEEPALIVE_INTERVAL)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import bisect
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+
+@dataclass
+class LLMTimings:
+    """Timestamps of a single LLM request, from ``time.perf_counter()``."""
+
+    request_id: str
+    model: str
+    agent_id: str | None
+    request_sent: float
+    first_byte: float | None = None
+    first_token: float | None = None
+    end: float | None = None
+    token_gaps: list[float] = field(default_factory=list)
+
+    @property
+    def ttfb(self) -> float | None:
+        """Time until the response headers arrived (network + queueing)."""
+        if self.first_byte is None:
+            return None
+        return self.first_byte - self.request_sent
+
+    @property
+    def ttft(self) -> float | None:
+        """Time until the first content or tool call token."""
+        if self.first_token is None:
+            return None
+        return self.first_token - self.request_sent
+
+    @property
+    def duration(self) -> float | None:
+        if self.end is None:
+            return None
+        return self.end - self.request_sent
+
+    @property
+    def max_token_gap(self) -> float | None:
+        return max(self.token_gaps) if self.token_gaps else None
+
+
+class Histogram:
+    """Fixed-bucket histogram of latencies in seconds."""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.BUCKETS[i] if i < len(self.BUCKETS) else self.max
+
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class LLMLatencyMetrics:
+    """Per model and agent_id latency histograms, plus the timings of recent requests."""
+
+    METRICS = ("ttfb", "ttft", "inter_token", "duration")
+
+    def __init__(self, *, max_recent: int = 256) -> None:
+        self._histograms: dict[tuple[str, str | None], dict[str, Histogram]] = {}
+        self._recent: OrderedDict[str, LLMTimings] = OrderedDict()
+        self._max_recent = max_recent
+
+    def record(self, timings: LLMTimings) -> None:
+        hists = self.histograms(timings.model, timings.agent_id)
+        for name, value in (
+            ("ttfb", timings.ttfb),
+            ("ttft", timings.ttft),
+            ("duration", timings.duration),
+        ):
+            if value is not None:
+                hists[name].observe(value)
+
+        for gap in timings.token_gaps:
+            hists["inter_token"].observe(gap)
+
+        if timings.request_id:
+            self._recent[timings.request_id] = timings
+            while len(self._recent) > self._max_recent:
+                self._recent.popitem(last=False)
+
+    def histograms(self, model: str, agent_id: str | None = None) -> dict[str, Histogram]:
+        hists = self._histograms.get((model, agent_id))
+        if hists is None:
+            hists = self._histograms[(model, agent_id)] = {
+                name: Histogram() for name in self.METRICS
+            }
+        return hists
+
+    def get_timings(self, request_id: str) -> LLMTimings | None:
+        """Timings of a recent request, e.g. for the ``LLMMetrics`` of a ``metrics_collected`` event."""
+        return self._recent.get(request_id)
+
+    def summary(self, *, agent_id: str | None = None) -> dict[str, dict[str, dict[str, float]]]:
+        """Histogram summaries of one agent, keyed by model."""
+        return {
+            model: {name: hist.summary() for name, hist in hists.items()}
+            for (model, hist_agent_id), hists in self._histograms.items()
+            if hist_agent_id == agent_id
+        }
+
+
+# shared by every LLM in the process
+llm_latency = LLMLatencyMetrics()
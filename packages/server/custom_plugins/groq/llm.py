@@ -19,6 +19,7 @@ from __future__ import annotations
 
 import asyncio
 import os
+import weakref
 from dataclasses import dataclass
 from typing import Any, Awaitable, MutableSet
 
@@ -33,6 +34,7 @@ from livekit.agents import (
 from openai.types.chat import ChatCompletionChunk, ChatCompletionMessageParam
 from openai.types.chat.chat_completion_chunk import Choice
 
+from ..parallel_fncs import ParallelFunctionCalls
 from .log import logger
 from .models import (
     CerebrasChatModels,
@@ -53,6 +55,8 @@ class LLMOptions:
     model: str | ChatModels
     user: str | None
     temperature: float | None
+    parallel_tool_calls: bool | None
+    fnc_timeout: float | None
 
 
 class LLM(llm.LLM):
@@ -65,16 +69,27 @@ class LLM(llm.LLM):
         user: str | None = None,
         client: openai.AsyncClient | None = None,
         temperature: float | None = None,
+        parallel_tool_calls: bool | None = None,
+        fnc_timeout: float | None = 10.0,
     ) -> None:
         """
         Create a new instance of OpenAI LLM.
 
         ``api_key`` must be set to your OpenAI API key, either using the argument or by setting the
         ``OPENAI_API_KEY`` environmental variable.
+
+        With ``parallel_tool_calls`` enabled, every tool call of a turn runs concurrently and
+        must finish within ``fnc_timeout`` seconds of the first one starting.
         """
         super().__init__()
 
-        self._opts = LLMOptions(model=model, user=user, temperature=temperature)
+        self._opts = LLMOptions(
+            model=model,
+            user=user,
+            temperature=temperature,
+            parallel_tool_calls=parallel_tool_calls,
+            fnc_timeout=fnc_timeout,
+        )
         self._client = client or openai.AsyncClient(
             api_key=api_key,
             base_url=base_url,
@@ -89,6 +104,7 @@ class LLM(llm.LLM):
             ),
         )
         self._running_fncs: MutableSet[asyncio.Task[Any]] = set()
+        self._messages = _MessageCache(id(self))
 
     @staticmethod
     def with_azure(
@@ -477,13 +493,12 @@ class LLM(llm.LLM):
         n: int | None = 1,
         parallel_tool_calls: bool | None = None,
     ) -> "LLMStream":
+        if parallel_tool_calls is None:
+            parallel_tool_calls = self._opts.parallel_tool_calls
+
         opts: dict[str, Any] = dict()
         if fnc_ctx and len(fnc_ctx.ai_functions) > 0:
-            fncs_desc = []
-            for fnc in fnc_ctx.ai_functions.values():
-                fncs_desc.append(llm._oai_api.build_oai_function_description(fnc))
-
-            opts["tools"] = fncs_desc
+            opts["tools"] = _build_tools(fnc_ctx)
 
             if fnc_ctx and parallel_tool_calls is not None:
                 opts["parallel_tool_calls"] = parallel_tool_calls
@@ -492,7 +507,7 @@ class LLM(llm.LLM):
         if temperature is None:
             temperature = self._opts.temperature
 
-        messages = _build_oai_context(chat_ctx, id(self))
+        messages = self._messages.build(chat_ctx)
 
         cmp = self._client.chat.completions.create(
             messages=messages,
@@ -505,7 +520,13 @@ class LLM(llm.LLM):
             **opts,
         )
 
-        return LLMStream(self, oai_stream=cmp, chat_ctx=chat_ctx, fnc_ctx=fnc_ctx)
+        return LLMStream(
+            self,
+            oai_stream=cmp,
+            chat_ctx=chat_ctx,
+            fnc_ctx=fnc_ctx,
+            parallel_tool_calls=bool(parallel_tool_calls),
+        )
 
 
 class LLMStream(llm.LLMStream):
@@ -516,6 +537,7 @@ class LLMStream(llm.LLMStream):
         oai_stream: Awaitable[openai.AsyncStream[ChatCompletionChunk]],
         chat_ctx: llm.ChatContext,
         fnc_ctx: llm.FunctionContext | None,
+        parallel_tool_calls: bool = False,
     ) -> None:
         super().__init__(llm, chat_ctx=chat_ctx, fnc_ctx=fnc_ctx)
         self._awaitable_oai_stream = oai_stream
@@ -526,6 +548,12 @@ class LLMStream(llm.LLMStream):
         self._fnc_name: str | None = None
         self._fnc_raw_arguments: str | None = None
 
+        self._parallel_fncs: ParallelFunctionCalls | None = None
+        if parallel_tool_calls:
+            self._parallel_fncs = ParallelFunctionCalls(
+                llm._running_fncs, timeout=llm._opts.fnc_timeout
+            )
+
     async def _main_task(self) -> None:
         if not self._oai_stream:
             self._oai_stream = await self._awaitable_oai_stream
@@ -627,6 +655,9 @@ class LLMStream(llm.LLMStream):
         )
 
         self._tool_call_id = self._fnc_name = self._fnc_raw_arguments = None
+        if self._parallel_fncs is not None:
+            fnc_info = self._parallel_fncs.add(fnc_info)
+
         self._function_calls_info.append(fnc_info)
 
         return llm.ChatChunk(
@@ -644,7 +675,63 @@ class LLMStream(llm.LLMStream):
         )
 
 
-def _build_oai_context(
-    chat_ctx: llm.ChatContext, cache_key: Any
-) -> list[ChatCompletionMessageParam]:
-    return [build_oai_message(msg, cache_key) for msg in chat_ctx.messages]  # type: ignore
\ No newline at end of file
+# compiled tools payload per function context, rebuilt when functions are added
+_tools_cache: weakref.WeakKeyDictionary[
+    llm.FunctionContext, tuple[tuple[int, ...], list[dict[str, Any]]]
+] = weakref.WeakKeyDictionary()
+
+
+def _build_tools(fnc_ctx: llm.FunctionContext) -> list[dict[str, Any]]:
+    """Return the tools payload for ``fnc_ctx``, compiling it once per set of functions."""
+    key = tuple(id(fnc) for fnc in fnc_ctx.ai_functions.values())
+    entry = _tools_cache.get(fnc_ctx)
+    if entry is None or entry[0] != key:
+        tools = [
+            llm._oai_api.build_oai_function_description(fnc)
+            for fnc in fnc_ctx.ai_functions.values()
+        ]
+        entry = _tools_cache[fnc_ctx] = (key, tools)
+
+    return entry[1]
+
+
+class _MessageCache:
+    """Converts chat messages to the OpenAI format, reusing conversions across turns.
+
+    The pipeline copies the chat context before every turn, so messages are keyed by
+    their stable ``id`` and only re-converted when their content changed.
+    """
+
+    def __init__(self, cache_key: Any) -> None:
+        self._cache_key = cache_key
+        self._entries: dict[str, tuple[tuple, ChatCompletionMessageParam]] = {}
+
+    def build(self, chat_ctx: llm.ChatContext) -> list[ChatCompletionMessageParam]:
+        result = []
+        for msg in chat_ctx.messages:
+            key = _message_key(msg)
+            entry = self._entries.get(msg.id)
+            if entry is None or entry[0] != key:
+                entry = (key, build_oai_message(msg, self._cache_key))  # type: ignore
+                self._entries[msg.id] = entry
+            result.append(entry[1])
+
+        # forget messages that were dropped from the context
+        if len(self._entries) > len(chat_ctx.messages):
+            ids = {msg.id for msg in chat_ctx.messages}
+            self._entries = {k: v for k, v in self._entries.items() if k in ids}
+
+        return result
+
+
+def _message_key(msg: llm.ChatMessage) -> tuple:
+    content = msg.content
+    if isinstance(content, list):
+        # images are cached by build_oai_message itself, compare them by identity
+        content = tuple(c if isinstance(c, str) else id(c) for c in content)
+
+    tool_call_ids = None
+    if msg.tool_calls:
+        tool_call_ids = tuple(tc.tool_call_id for tc in msg.tool_calls)
+
+    return (msg.role, content, msg.tool_call_id, tool_call_ids)
\ No newline at end of file
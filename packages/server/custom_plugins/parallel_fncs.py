@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+from typing import Any, MutableSet
+
+from livekit.agents import llm
+
+
+class ParallelFunctionCalls:
+    """Runs every tool call of a turn concurrently under a shared deadline.
+
+    The pipeline awaits the calls of a turn one after another, so executing the first
+    call starts all of its siblings and each call then only waits for its own task.
+    """
+
+    def __init__(
+        self, running_fncs: MutableSet[asyncio.Task[Any]], *, timeout: float | None
+    ) -> None:
+        self._running_fncs = running_fncs
+        self._timeout = timeout
+        self._deadline: float | None = None
+        self._calls: list[llm.function_context.FunctionCallInfo] = []
+        self._tasks: list[asyncio.Task[Any]] = []
+
+    def add(
+        self, fnc_info: llm.function_context.FunctionCallInfo
+    ) -> llm.function_context.FunctionCallInfo:
+        index = len(self._calls)
+        self._calls.append(fnc_info)
+
+        async def _run_in_turn(**kwargs: Any) -> Any:
+            return await self._start()[index]
+
+        return dataclasses.replace(
+            fnc_info,
+            function_info=dataclasses.replace(
+                fnc_info.function_info, callable=_run_in_turn
+            ),
+        )
+
+    def _start(self) -> list[asyncio.Task[Any]]:
+        loop = asyncio.get_running_loop()
+        if self._deadline is None and self._timeout is not None:
+            self._deadline = loop.time() + self._timeout
+
+        for fnc_info in self._calls[len(self._tasks) :]:
+            task = asyncio.create_task(self._execute(fnc_info))
+            self._running_fncs.add(task)
+            task.add_done_callback(self._running_fncs.discard)
+            self._tasks.append(task)
+
+        return self._tasks
+
+    async def _execute(self, fnc_info: llm.function_context.FunctionCallInfo) -> Any:
+        fnc = fnc_info.function_info.callable
+        if asyncio.iscoroutinefunction(fnc):
+            coro = fnc(**fnc_info.arguments)
+        else:
+            coro = asyncio.to_thread(fnc, **fnc_info.arguments)
+
+        if self._deadline is None:
+            return await coro
+
+        timeout = max(self._deadline - asyncio.get_running_loop().time(), 0.0)
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"AI function {fnc_info.function_info.name} did not finish within "
+                f"{self._timeout}s"
+            ) from None
@@ -0,0 +1,32 @@
+"""Local stand-ins for the agent's external providers.
+
+Each fake speaks the provider's wire protocol with configurable latency, jitter,
+error rate and throughput (see ``Behavior``), so load and latency experiments can
+run offline and deterministically. ``python -m fake_providers`` serves all of them
+and prints the environment variables pointing the agent at them.
+"""
+
+from .behavior import Behavior, create_app
+from .cartesia import create_cartesia_app
+from .cerebras import create_cerebras_app
+from .deepgram import create_deepgram_app
+from .google_calendar import create_google_calendar_app
+from .graham_api import create_graham_api_app
+from .openai_embeddings import create_openai_embeddings_app, fake_embedding
+from .pinecone import create_pinecone_app
+from .server import PROVIDERS, FakeProviders
+
+__all__ = [
+    "Behavior",
+    "FakeProviders",
+    "PROVIDERS",
+    "create_app",
+    "create_cartesia_app",
+    "create_cerebras_app",
+    "create_deepgram_app",
+    "create_google_calendar_app",
+    "create_graham_api_app",
+    "create_openai_embeddings_app",
+    "create_pinecone_app",
+    "fake_embedding",
+]
@@ -0,0 +1,40 @@
+"""Serve every fake provider and print the environment pointing the agent at them.
+
+    python -m fake_providers [--host 127.0.0.1] [--base-port 9100]
+
+Per-provider behavior is read from ``FAKE_<PROVIDER>_LATENCY``, ``_JITTER``,
+``_ERROR_RATE`` and ``_THROUGHPUT``, ``FAKE_SEED`` makes the runs repeatable.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from .server import FakeProviders
+
+logger = logging.getLogger("fake-providers")
+
+
+async def main(host: str, base_port: int) -> None:
+    async with FakeProviders(host=host, base_port=base_port) as providers:
+        for name, url in providers.urls.items():
+            logger.info(f"{name} listening on {url}")
+
+        for key, value in providers.env().items():
+            print(f"export {key}={value}")
+        print(flush=True)
+
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=9100)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main(args.host, args.base_port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+
+@dataclass
+class Behavior:
+    """How a fake provider misbehaves: latency distribution, error rate and throughput.
+
+    ``latency`` is the median delay in seconds before a response starts, ``jitter`` the
+    sigma of the lognormal spread around it. ``throughput`` is provider specific (tokens
+    per second for the LLM, realtime factor for TTS), ``0`` means unlimited.
+    """
+
+    latency: float = 0.05
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throughput: float = 0.0
+    seed: int | None = None
+    rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.rng = random.Random(self.seed)
+
+    @classmethod
+    def from_env(cls, name: str, **defaults: float) -> "Behavior":
+        """Read ``FAKE_<NAME>_LATENCY``, ``_JITTER``, ``_ERROR_RATE`` and ``_THROUGHPUT``."""
+        prefix = f"FAKE_{name.upper()}_"
+        values = {
+            key: float(os.getenv(prefix + key.upper(), defaults.get(key, getattr(cls, key))))
+            for key in ("latency", "jitter", "error_rate", "throughput")
+        }
+        seed = os.getenv("FAKE_SEED")
+        return cls(**values, seed=int(seed) if seed is not None else None)
+
+    def sample_latency(self) -> float:
+        if self.jitter <= 0:
+            return self.latency
+        return self.latency * math.exp(self.rng.gauss(0.0, self.jitter))
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and self.rng.random() < self.error_rate
+
+    async def delay(self) -> None:
+        latency = self.sample_latency()
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+    async def pace(self, units: float) -> None:
+        """Sleep for as long as producing ``units`` takes at ``throughput``."""
+        if self.throughput > 0 and units > 0:
+            await asyncio.sleep(units / self.throughput)
+
+
+def create_app(name: str, behavior: Behavior) -> web.Application:
+    """Application shared by every fake: latency and errors are injected before each handler.
+
+    Request counts per route are served on ``GET /_fake/stats``.
+    """
+    stats: Counter[str] = Counter()
+
+    @web.middleware
+    async def behavior_middleware(request: web.Request, handler):
+        if request.path.startswith("/_fake/"):
+            return await handler(request)
+
+        route = request.match_info.route.resource
+        stats[route.canonical if route is not None else request.path] += 1
+
+        await behavior.delay()
+        if behavior.should_fail():
+            stats["errors"] += 1
+            return web.json_response(
+                {"error": {"message": f"fake {name} error", "code": 503}}, status=503
+            )
+
+        return await handler(request)
+
+    async def stats_handler(request: web.Request) -> web.Response:
+        return web.json_response({"provider": name, "requests": dict(stats)})
+
+    app = web.Application(middlewares=[behavior_middleware])
+    app["behavior"] = behavior
+    app["stats"] = stats
+    app.router.add_get("/_fake/stats", stats_handler)
+    return app
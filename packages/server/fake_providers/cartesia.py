@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+from .behavior import Behavior, create_app
+
+# speaking rate of the synthesized audio
+SECONDS_PER_CHAR = 0.06
+CHUNK_DURATION = 0.04
+
+
+def synthesize(text: str, sample_rate: int) -> bytes:
+    """Low tone lasting as long as ``text`` would take to say, pcm_s16le mono."""
+    duration = len(text.strip()) * SECONDS_PER_CHAR
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    return (np.sin(2 * np.pi * 220 * t) * 3000).astype(np.int16).tobytes()
+
+
+def create_cartesia_app(behavior: Behavior | None = None) -> web.Application:
+    """Cartesia ``/tts/websocket`` and ``/tts/bytes`` (``CARTESIA_BASE_URL``).
+
+    ``throughput`` is the realtime factor audio is produced at (``0`` for as fast as
+    possible), ``latency`` delays the first chunk of every transcript.
+    """
+    behavior = behavior or Behavior.from_env("cartesia", throughput=4.0)
+    app = create_app("cartesia", behavior)
+
+    async def stream_audio(text: str, sample_rate: int):
+        audio = synthesize(text, sample_rate)
+        chunk_size = int(CHUNK_DURATION * sample_rate) * 2
+        for i in range(0, len(audio), chunk_size):
+            await behavior.pace(CHUNK_DURATION)
+            yield audio[i:i + chunk_size]
+
+    async def websocket(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        contexts: dict[str, asyncio.Task] = {}
+
+        async def synthesize_segment(previous: asyncio.Task | None, pkt: dict) -> None:
+            # segments of a context are spoken in order, contexts run concurrently
+            if previous is not None:
+                await previous
+
+            context_id = pkt.get("context_id")
+            sample_rate = pkt.get("output_format", {}).get("sample_rate", 24000)
+            if pkt.get("transcript", "").strip():
+                await behavior.delay()
+                async for chunk in stream_audio(pkt["transcript"], sample_rate):
+                    await ws.send_str(
+                        json.dumps(
+                            {
+                                "type": "chunk",
+                                "context_id": context_id,
+                                "data": base64.b64encode(chunk).decode(),
+                                "done": False,
+                            }
+                        )
+                    )
+
+            if not pkt.get("continue", False):
+                await ws.send_str(
+                    json.dumps({"type": "done", "context_id": context_id, "done": True})
+                )
+
+            if contexts.get(context_id) is asyncio.current_task():
+                del contexts[context_id]
+
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+
+                pkt = json.loads(msg.data)
+                context_id = pkt.get("context_id")
+                contexts[context_id] = asyncio.create_task(
+                    synthesize_segment(contexts.get(context_id), pkt)
+                )
+        finally:
+            for task in contexts.values():
+                task.cancel()
+        return ws
+
+    async def tts_bytes(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        sample_rate = body.get("output_format", {}).get("sample_rate", 24000)
+
+        resp = web.StreamResponse(headers={"Content-Type": "application/octet-stream"})
+        await resp.prepare(request)
+        async for chunk in stream_audio(body.get("transcript", ""), sample_rate):
+            await resp.write(chunk)
+        await resp.write_eof()
+        return resp
+
+    app.router.add_get("/tts/websocket", websocket)
+    app.router.add_post("/tts/bytes", tts_bytes)
+    return app
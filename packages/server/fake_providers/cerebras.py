@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+
+from aiohttp import web
+
+from .behavior import Behavior, create_app
+
+DEFAULT_REPLY = (
+    "Thanks for calling! I can help you with that. "
+    "Is there anything else you would like to know?"
+)
+
+
+def create_cerebras_app(behavior: Behavior | None = None) -> web.Application:
+    """OpenAI compatible chat completions, as served by ``CEREBRAS_BASE_URL``.
+
+    Every completion streams ``FAKE_CEREBRAS_REPLY`` one word per chunk, paced at
+    ``throughput`` tokens per second.
+    """
+    behavior = behavior or Behavior.from_env("cerebras", throughput=1000)
+    app = create_app("cerebras", behavior)
+    reply = os.getenv("FAKE_CEREBRAS_REPLY", DEFAULT_REPLY)
+
+    async def list_models(request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "object": "list",
+                "data": [
+                    {"id": model, "object": "model", "created": 0, "owned_by": "Cerebras"}
+                    for model in ("llama3.1-8b", "llama3.1-70b")
+                ],
+            }
+        )
+
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        completion_id = f"chatcmpl-{uuid.uuid4()}"
+        model = body.get("model", "llama3.1-8b")
+        created = int(time.time())
+        words = reply.split(" ")
+        prompt_tokens = sum(
+            len(str(msg.get("content") or "")) // 4 + 1 for msg in body.get("messages", [])
+        )
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(words),
+            "total_tokens": prompt_tokens + len(words),
+        }
+
+        if not body.get("stream"):
+            return web.json_response(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "system_fingerprint": "fake",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": reply},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": usage,
+                }
+            )
+
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+
+        async def send(delta: dict, finish_reason: str | None = None, usage: dict | None = None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "system_fingerprint": "fake",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                "usage": usage,
+            }
+            await resp.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+        await send({"role": "assistant", "content": ""})
+        for i, word in enumerate(words):
+            await behavior.pace(1)
+            await send({"content": word if i == 0 else f" {word}"})
+        await send({}, finish_reason="stop", usage=usage)
+        await resp.write(b"data: [DONE]\n\n")
+        await resp.write_eof()
+        return resp
+
+    app.router.add_get("/v1/models", list_models)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import uuid
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+from .behavior import Behavior, create_app
+
+DEFAULT_TRANSCRIPTS = (
+    "Hi, I'd like to book an appointment.|"
+    "Do you have anything available tomorrow afternoon?|"
+    "What are your opening hours?|"
+    "Thanks, that's all."
+)
+
+# int16 RMS above which a frame counts as speech
+SPEECH_RMS = 500
+INTERIM_INTERVAL = 0.4
+
+
+def create_deepgram_app(behavior: Behavior | None = None) -> web.Application:
+    """Deepgram live transcription websocket (``DEEPGRAM_BASE_URL``).
+
+    Speech is detected from the energy of the received audio, each utterance is
+    transcribed as the next entry of ``FAKE_DEEPGRAM_TRANSCRIPTS`` ("|" separated).
+    ``latency`` delays every result, like the recognition delay of the real service.
+    """
+    behavior = behavior or Behavior.from_env("deepgram")
+    app = create_app("deepgram", behavior)
+    transcripts = os.getenv("FAKE_DEEPGRAM_TRANSCRIPTS", DEFAULT_TRANSCRIPTS).split("|")
+
+    async def listen(request: web.Request) -> web.StreamResponse:
+        if request.headers.get("Upgrade", "").lower() != "websocket":
+            return await _prerecorded(request, transcripts)
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        session = _LiveSession(
+            ws,
+            behavior,
+            transcripts,
+            sample_rate=int(request.query.get("sample_rate", 16000)),
+            channels=int(request.query.get("channels", 1)),
+            endpointing=float(request.query.get("endpointing", 25) or 25) / 1000,
+            interim_results=request.query.get("interim_results") == "true",
+        )
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.BINARY:
+                    await session.push_audio(msg.data)
+                elif msg.type == WSMsgType.TEXT:
+                    kind = json.loads(msg.data).get("type")
+                    if kind == "Finalize":
+                        await session.end_utterance()
+                    elif kind == "CloseStream":
+                        await session.end_utterance()
+                        await session.send_metadata()
+                        break
+        finally:
+            await session.aclose()
+            await ws.close()
+        return ws
+
+    app.router.add_route("*", "/v1/listen", listen)
+    return app
+
+
+class _LiveSession:
+    def __init__(
+        self,
+        ws: web.WebSocketResponse,
+        behavior: Behavior,
+        transcripts: list[str],
+        *,
+        sample_rate: int,
+        channels: int,
+        endpointing: float,
+        interim_results: bool,
+    ) -> None:
+        self._ws = ws
+        self._behavior = behavior
+        self._transcripts = transcripts
+        self._sample_rate = sample_rate
+        self._channels = channels
+        self._endpointing = max(endpointing, 0.3)
+        self._interim_results = interim_results
+
+        self._request_id = str(uuid.uuid4())
+        self._audio_time = 0.0
+        self._speech_start: float | None = None
+        self._last_speech = 0.0
+        self._last_interim = 0.0
+        self._utterances = 0
+        self._outbox: asyncio.Queue[tuple[float, dict] | None] = asyncio.Queue()
+        self._sender = asyncio.create_task(self._send_loop())
+
+    async def push_audio(self, data: bytes) -> None:
+        samples = np.frombuffer(data[: len(data) // 2 * 2], dtype=np.int16)
+        duration = len(samples) / (self._sample_rate * self._channels)
+        start = self._audio_time
+        self._audio_time += duration
+
+        rms = float(np.sqrt(np.mean(samples.astype(np.float32) ** 2))) if len(samples) else 0.0
+        if rms >= SPEECH_RMS:
+            if self._speech_start is None:
+                self._speech_start = start
+                self._last_interim = start
+                self._send({"type": "SpeechStarted", "channel": [0], "timestamp": start})
+            self._last_speech = self._audio_time
+
+        if self._speech_start is None:
+            return
+
+        if self._audio_time - self._last_speech >= self._endpointing:
+            await self.end_utterance()
+        elif self._interim_results and self._audio_time - self._last_interim >= INTERIM_INTERVAL:
+            self._last_interim = self._audio_time
+            self._send(self._results(partial=True))
+
+    async def end_utterance(self) -> None:
+        if self._speech_start is None:
+            return
+
+        self._send(self._results(partial=False))
+        self._utterances += 1
+        self._speech_start = None
+
+    async def send_metadata(self) -> None:
+        self._send(
+            {
+                "type": "Metadata",
+                "request_id": self._request_id,
+                "duration": self._audio_time,
+                "channels": self._channels,
+            }
+        )
+        self._outbox.put_nowait(None)
+        await self._sender
+
+    async def aclose(self) -> None:
+        self._sender.cancel()
+
+    def _results(self, *, partial: bool) -> dict:
+        words = self._transcripts[self._utterances % len(self._transcripts)].split()
+        end = self._last_speech if not partial else self._audio_time
+        if partial:
+            spoken = (end - self._speech_start) / max(self._last_speech - self._speech_start, 0.5)
+            words = words[: max(1, int(len(words) * min(spoken, 1.0)))]
+
+        step = (end - self._speech_start) / max(len(words), 1)
+        return {
+            "type": "Results",
+            "channel_index": [0, 1],
+            "duration": end - self._speech_start,
+            "start": self._speech_start,
+            "is_final": not partial,
+            "speech_final": not partial,
+            "channel": {
+                "alternatives": [
+                    {
+                        "transcript": " ".join(words),
+                        "confidence": 0.99,
+                        "words": [
+                            {
+                                "word": word,
+                                "start": self._speech_start + i * step,
+                                "end": self._speech_start + (i + 1) * step,
+                                "confidence": 0.99,
+                            }
+                            for i, word in enumerate(words)
+                        ],
+                    }
+                ]
+            },
+            "metadata": {"request_id": self._request_id},
+        }
+
+    def _send(self, payload: dict) -> None:
+        # results are delayed off the receive loop, which keeps consuming audio meanwhile
+        loop = asyncio.get_running_loop()
+        self._outbox.put_nowait((loop.time() + self._behavior.sample_latency(), payload))
+
+    async def _send_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while (item := await self._outbox.get()) is not None:
+            due, payload = item
+            # results keep their order, a late one holds back the ones after it
+            if due > loop.time():
+                await asyncio.sleep(due - loop.time())
+            if self._ws.closed:
+                return
+            await self._ws.send_str(json.dumps(payload))
+
+
+async def _prerecorded(request: web.Request, transcripts: list[str]) -> web.Response:
+    await request.read()
+    transcript = transcripts[0]
+    return web.json_response(
+        {
+            "metadata": {"request_id": str(uuid.uuid4())},
+            "results": {
+                "channels": [
+                    {"alternatives": [{"transcript": transcript, "confidence": 0.99, "words": []}]}
+                ]
+            },
+        }
+    )
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+from .behavior import Behavior, create_app
+
+
+def create_google_calendar_app(behavior: Behavior | None = None) -> web.Application:
+    """Calendar v3 events list/insert/get (``GOOGLE_CALENDAR_API_URL``) and an OAuth token
+    endpoint (``GOOGLE_OAUTH_TOKEN_URI``), backed by in-memory calendars."""
+    behavior = behavior or Behavior.from_env("google_calendar")
+    app = create_app("google_calendar", behavior)
+    calendars: dict[str, dict[str, dict]] = {}
+
+    async def list_events(request: web.Request) -> web.Response:
+        events = calendars.get(request.match_info["calendar_id"], {}).values()
+        time_min = _parse(request.query.get("timeMin"))
+        time_max = _parse(request.query.get("timeMax"))
+
+        items = [
+            event for event in events
+            if (time_max is None or _start(event) < time_max)
+            and (time_min is None or _end(event) > time_min)
+        ]
+        if request.query.get("orderBy") == "startTime":
+            items.sort(key=_start)
+
+        start = int(request.query.get("pageToken") or 0)
+        max_results = int(request.query.get("maxResults", 250))
+        response = {"kind": "calendar#events", "items": items[start:start + max_results]}
+        if start + max_results < len(items):
+            response["nextPageToken"] = str(start + max_results)
+        return web.json_response(response)
+
+    async def get_event(request: web.Request) -> web.Response:
+        event = calendars.get(request.match_info["calendar_id"], {}).get(request.match_info["event_id"])
+        if event is None:
+            return web.json_response({"error": {"code": 404, "message": "Not Found"}}, status=404)
+        return web.json_response(event)
+
+    async def insert_event(request: web.Request) -> web.Response:
+        body = await request.json()
+        calendar = calendars.setdefault(request.match_info["calendar_id"], {})
+        event_id = body.get("id") or uuid.uuid4().hex
+        if event_id in calendar:
+            return web.json_response(
+                {"error": {"code": 409, "message": "The requested identifier already exists."}}, status=409
+            )
+        now = datetime.now(timezone.utc).isoformat()
+        event = {
+            **body,
+            "kind": "calendar#event",
+            "id": event_id,
+            "status": "confirmed",
+            "created": now,
+            "updated": now,
+            "htmlLink": f"{request.scheme}://{request.host}/event?eid={event_id}",
+        }
+        calendar[event_id] = event
+        return web.json_response(event)
+
+    async def token(request: web.Request) -> web.Response:
+        form = await request.post()
+        response = {
+            "access_token": f"fake-access-{uuid.uuid4().hex}",
+            "expires_in": 3600,
+            "token_type": "Bearer",
+            "scope": "https://www.googleapis.com/auth/calendar",
+            "issued_at": int(time.time()),
+        }
+        if form.get("refresh_token"):
+            response["refresh_token"] = form["refresh_token"]
+        return web.json_response(response)
+
+    app.router.add_get("/calendar/v3/calendars/{calendar_id}/events", list_events)
+    app.router.add_post("/calendar/v3/calendars/{calendar_id}/events", insert_event)
+    app.router.add_get("/calendar/v3/calendars/{calendar_id}/events/{event_id}", get_event)
+    app.router.add_post("/token", token)
+    return app
+
+
+def _parse(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone()
+    return parsed
+
+
+def _start(event: dict) -> datetime:
+    return _parse(event["start"].get("dateTime") or event["start"].get("date"))
+
+
+def _end(event: dict) -> datetime:
+    return _parse(event["end"].get("dateTime") or event["end"].get("date"))
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from aiohttp import web
+
+from .behavior import Behavior, create_app
+
+API_KEY = "fake"
+
+
+def create_graham_api_app(behavior: Behavior | None = None) -> web.Application:
+    """The Graham API calendar token update (``GRAHAM_API_URL``).
+
+    Tokens posted to ``/api/calendar/update-tokens`` are kept per agent and user and
+    served back on ``GET /api/calendar/tokens/{agent_id}/{user_id}``.
+    """
+    behavior = behavior or Behavior.from_env("graham_api")
+    app = create_app("graham_api", behavior)
+    tokens: dict[tuple[str, str], dict] = {}
+
+    async def update_tokens(request: web.Request) -> web.Response:
+        if request.headers.get("Authorization") != f"Bearer {API_KEY}":
+            return web.json_response({"error": "Unauthorized"}, status=401)
+
+        body = await request.json()
+        missing = [key for key in ("agentId", "userId", "accessToken", "expiresAt") if not body.get(key)]
+        if missing:
+            return web.json_response({"error": f"Missing {', '.join(missing)}"}, status=400)
+
+        tokens[(body["agentId"], body["userId"])] = body
+        return web.json_response({"success": True})
+
+    async def get_tokens(request: web.Request) -> web.Response:
+        body = tokens.get((request.match_info["agent_id"], request.match_info["user_id"]))
+        if body is None:
+            return web.json_response({"error": "Not Found"}, status=404)
+        return web.json_response(body)
+
+    app.router.add_post("/api/calendar/update-tokens", update_tokens)
+    app.router.add_get("/api/calendar/tokens/{agent_id}/{user_id}", get_tokens)
+    return app
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import hashlib
+import re
+
+import numpy as np
+from aiohttp import web
+
+from .behavior import Behavior, create_app
+
+
+def fake_embedding(text: str, dimensions: int = 1536) -> list[float]:
+    """Deterministic unit vector, texts sharing words get similar vectors."""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for word in re.findall(r"\w+", text.lower()) or [text]:
+        seed = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+        vector += np.random.default_rng(seed).standard_normal(dimensions, dtype=np.float32)
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector.tolist()
+
+
+def create_openai_embeddings_app(behavior: Behavior | None = None) -> web.Application:
+    """OpenAI ``/v1/embeddings``, as served by ``OPENAI_BASE_URL``."""
+    behavior = behavior or Behavior.from_env("openai")
+    app = create_app("openai", behavior)
+
+    async def embeddings(request: web.Request) -> web.Response:
+        body = await request.json()
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+
+        dimensions = int(body.get("dimensions") or 1536)
+        tokens = sum(len(text) // 4 + 1 for text in inputs)
+        await behavior.pace(tokens)
+
+        return web.json_response(
+            {
+                "object": "list",
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": fake_embedding(text, dimensions)}
+                    for i, text in enumerate(inputs)
+                ],
+                "model": body.get("model", "text-embedding-3-small"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            }
+        )
+
+    app.router.add_post("/v1/embeddings", embeddings)
+    return app
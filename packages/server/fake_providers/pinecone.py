@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import numpy as np
+from aiohttp import web
+
+from .behavior import Behavior, create_app
+
+
+class _Namespace:
+    def __init__(self) -> None:
+        self.vectors: dict[str, tuple[np.ndarray, dict]] = {}
+
+    def query(self, vector: list[float], top_k: int, flt: dict | None) -> list[tuple[str, float, dict]]:
+        candidates = [
+            (vid, values, metadata)
+            for vid, (values, metadata) in self.vectors.items()
+            if flt is None or _matches(metadata, flt)
+        ]
+        if not candidates:
+            return []
+
+        matrix = np.stack([values for _, values, _ in candidates])
+        query = np.asarray(vector, dtype=np.float32)
+        scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-9)
+        order = np.argsort(-scores)[:top_k]
+        return [(candidates[i][0], float(scores[i]), candidates[i][2]) for i in order]
+
+
+def create_pinecone_app(behavior: Behavior | None = None, *, dimension: int = 1536) -> web.Application:
+    """Pinecone control plane (``PINECONE_CONTROLLER_HOST``) and data plane (``PINECONE_INDEX_HOST``).
+
+    Every index name resolves to the same in-memory index served by this app.
+    """
+    behavior = behavior or Behavior.from_env("pinecone")
+    app = create_app("pinecone", behavior)
+    namespaces: dict[str, _Namespace] = {}
+
+    def namespace(name: str | None) -> _Namespace:
+        return namespaces.setdefault(name or "", _Namespace())
+
+    async def describe_index(request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "name": request.match_info["name"],
+                "dimension": dimension,
+                "metric": "cosine",
+                "host": f"{request.scheme}://{request.host}",
+                "vector_type": "dense",
+                "deletion_protection": "disabled",
+                "spec": {"serverless": {"cloud": "aws", "region": "us-east-1"}},
+                "deployment": {"deployment_type": "managed", "cloud": "aws", "region": "us-east-1"},
+                "schema": {"fields": {}},
+                "status": {"ready": True, "state": "Ready"},
+            }
+        )
+
+    async def upsert(request: web.Request) -> web.Response:
+        body = await request.json()
+        ns = namespace(body.get("namespace"))
+        for vector in body.get("vectors", []):
+            ns.vectors[vector["id"]] = (
+                np.asarray(vector["values"], dtype=np.float32),
+                vector.get("metadata") or {},
+            )
+        return web.json_response({"upsertedCount": len(body.get("vectors", []))})
+
+    async def update(request: web.Request) -> web.Response:
+        body = await request.json()
+        ns = namespace(body.get("namespace"))
+        if body["id"] in ns.vectors:
+            values, metadata = ns.vectors[body["id"]]
+            if body.get("values"):
+                values = np.asarray(body["values"], dtype=np.float32)
+            ns.vectors[body["id"]] = (values, {**metadata, **body.get("setMetadata", {})})
+        return web.json_response({})
+
+    async def query(request: web.Request) -> web.Response:
+        body = await request.json()
+        ns = namespace(body.get("namespace"))
+        vector = body.get("vector")
+        if vector is None and body.get("id") in ns.vectors:
+            vector = ns.vectors[body["id"]][0]
+        if vector is None:
+            return web.json_response({"matches": [], "namespace": body.get("namespace", "")})
+
+        matches = []
+        for vid, score, metadata in ns.query(vector, int(body.get("topK", 10)), body.get("filter")):
+            match = {"id": vid, "score": score}
+            if body.get("includeMetadata"):
+                match["metadata"] = metadata
+            if body.get("includeValues"):
+                match["values"] = ns.vectors[vid][0].tolist()
+            matches.append(match)
+
+        return web.json_response(
+            {"matches": matches, "namespace": body.get("namespace", ""), "usage": {"readUnits": 1}}
+        )
+
+    async def fetch(request: web.Request) -> web.Response:
+        ns_name = request.query.get("namespace", "")
+        ns = namespace(ns_name)
+        vectors = {
+            vid: {"id": vid, "values": ns.vectors[vid][0].tolist(), "metadata": ns.vectors[vid][1]}
+            for vid in request.query.getall("ids", [])
+            if vid in ns.vectors
+        }
+        return web.json_response({"vectors": vectors, "namespace": ns_name})
+
+    async def list_vectors(request: web.Request) -> web.Response:
+        ns_name = request.query.get("namespace", "")
+        prefix = request.query.get("prefix", "")
+        limit = int(request.query.get("limit", 100))
+        start = int(request.query.get("paginationToken") or 0)
+
+        ids = sorted(vid for vid in namespace(ns_name).vectors if vid.startswith(prefix))
+        page = ids[start:start + limit]
+        response = {"vectors": [{"id": vid} for vid in page], "namespace": ns_name}
+        if start + limit < len(ids):
+            response["pagination"] = {"next": str(start + limit)}
+        return web.json_response(response)
+
+    async def delete(request: web.Request) -> web.Response:
+        body = await request.json()
+        ns = namespace(body.get("namespace"))
+        if body.get("deleteAll"):
+            ns.vectors.clear()
+        elif body.get("filter"):
+            for vid in [v for v, (_, m) in ns.vectors.items() if _matches(m, body["filter"])]:
+                del ns.vectors[vid]
+        else:
+            for vid in body.get("ids", []):
+                ns.vectors.pop(vid, None)
+        return web.json_response({})
+
+    async def describe_index_stats(request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "dimension": dimension,
+                "indexFullness": 0.0,
+                "totalVectorCount": sum(len(ns.vectors) for ns in namespaces.values()),
+                "namespaces": {
+                    name: {"vectorCount": len(ns.vectors)} for name, ns in namespaces.items()
+                },
+            }
+        )
+
+    app.router.add_get("/indexes/{name}", describe_index)
+    app.router.add_post("/vectors/upsert", upsert)
+    app.router.add_post("/vectors/update", update)
+    app.router.add_post("/query", query)
+    app.router.add_get("/vectors/fetch", fetch)
+    app.router.add_get("/vectors/list", list_vectors)
+    app.router.add_post("/vectors/delete", delete)
+    app.router.add_post("/describe_index_stats", describe_index_stats)
+    return app
+
+
+def _matches(metadata: dict, flt: dict) -> bool:
+    """Subset of Pinecone's metadata filter language: $and, $or and the comparison operators."""
+    for key, cond in flt.items():
+        if key == "$and":
+            if not all(_matches(metadata, sub) for sub in cond):
+                return False
+            continue
+        if key == "$or":
+            if not any(_matches(metadata, sub) for sub in cond):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if not isinstance(cond, dict):
+            cond = {"$eq": cond}
+
+        for op, expected in cond.items():
+            if op == "$eq" and value != expected:
+                return False
+            if op == "$ne" and value == expected:
+                return False
+            if op == "$in" and value not in expected:
+                return False
+            if op == "$nin" and value in expected:
+                return False
+            if op == "$exists" and (key in metadata) != expected:
+                return False
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                if not isinstance(value, (int, float)):
+                    return False
+                if op == "$gt" and not value > expected:
+                    return False
+                if op == "$gte" and not value >= expected:
+                    return False
+                if op == "$lt" and not value < expected:
+                    return False
+                if op == "$lte" and not value <= expected:
+                    return False
+    return True
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from aiohttp import web
+
+from .behavior import Behavior
+from .cartesia import create_cartesia_app
+from .cerebras import create_cerebras_app
+from .deepgram import create_deepgram_app
+from .google_calendar import create_google_calendar_app
+from .graham_api import create_graham_api_app
+from .openai_embeddings import create_openai_embeddings_app
+from .pinecone import create_pinecone_app
+
+PROVIDERS: dict[str, Callable[[Behavior | None], web.Application]] = {
+    "cerebras": create_cerebras_app,
+    "openai": create_openai_embeddings_app,
+    "pinecone": create_pinecone_app,
+    "google_calendar": create_google_calendar_app,
+    "deepgram": create_deepgram_app,
+    "cartesia": create_cartesia_app,
+    "graham_api": create_graham_api_app,
+}
+
+
+class FakeProviders:
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        base_port: int = 0,
+        behaviors: dict[str, Behavior] | None = None,
+    ) -> None:
+        """
+        Serve every fake provider on its own port, ``base_port`` and up.
+
+        With ``base_port=0`` free ports are picked, read them back from ``env()``.
+        ``behaviors`` overrides the per-provider ``Behavior`` read from the environment.
+        """
+        self._host = host
+        self._base_port = base_port
+        self._behaviors = behaviors or {}
+        self._runners: dict[str, web.AppRunner] = {}
+        self.urls: dict[str, str] = {}
+
+    async def start(self) -> None:
+        for i, (name, create) in enumerate(PROVIDERS.items()):
+            runner = web.AppRunner(create(self._behaviors.get(name)), access_log=None)
+            await runner.setup()
+            site = web.TCPSite(
+                runner, self._host, self._base_port + i if self._base_port else 0
+            )
+            await site.start()
+
+            port = site._server.sockets[0].getsockname()[1]
+            self._runners[name] = runner
+            self.urls[name] = f"http://{self._host}:{port}"
+
+    async def aclose(self) -> None:
+        for runner in self._runners.values():
+            await runner.cleanup()
+        self._runners.clear()
+
+    async def __aenter__(self) -> "FakeProviders":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    def env(self) -> dict[str, str]:
+        """Environment variables pointing the agent, its plugins and SDKs at the fakes."""
+        urls = self.urls
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+        return {
+            "CEREBRAS_BASE_URL": urls["cerebras"],
+            "CEREBRAS_API_KEY": "fake",
+            "OPENAI_BASE_URL": f"{urls['openai']}/v1",
+            "OPENAI_API_KEY": "fake",
+            "PINECONE_CONTROLLER_HOST": urls["pinecone"],
+            "PINECONE_INDEX_HOST": urls["pinecone"],
+            "PINECONE_API_KEY": "fake",
+            "GOOGLE_CALENDAR_API_URL": f"{urls['google_calendar']}/calendar/v3/",
+            "GOOGLE_OAUTH_TOKEN_URI": f"{urls['google_calendar']}/token",
+            "GOOGLE_CALENDAR_ENABLED": "true",
+            "GOOGLE_CALENDAR_ACCESS_TOKEN": "fake-access",
+            "GOOGLE_CALENDAR_REFRESH_TOKEN": "fake-refresh",
+            "GOOGLE_CALENDAR_EXPIRES_AT": expires_at.replace(tzinfo=None).isoformat(),
+            "GOOGLE_CLIENT_ID": "fake",
+            "GOOGLE_CLIENT_SECRET": "fake",
+            "DEEPGRAM_BASE_URL": f"{urls['deepgram']}/v1/listen",
+            "DEEPGRAM_API_KEY": "fake",
+            "CARTESIA_BASE_URL": urls["cartesia"],
+            "CARTESIA_API_KEY": "fake",
+            "GRAHAM_API_URL": urls["graham_api"],
+            "GRAHAM_API_KEY": "fake",
+        }
@@ -1,6 +1,9 @@
+import asyncio
 import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from livekit.agents import AutoSubscribe, JobContext, WorkerOptions, WorkerType, cli, llm
 from livekit.agents.pipeline import VoicePipelineAgent
@@ -14,6 +17,13 @@ from custom_plugins import cerebras
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger("rag-worker")
 
+# Pinecone's client is blocking, queries run on a bounded pool off the event loop
+PINECONE_QUERY_TIMEOUT = float(os.getenv('PINECONE_QUERY_TIMEOUT', '2.0'))
+_pinecone_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('PINECONE_QUERY_WORKERS', '8')),
+    thread_name_prefix="pinecone-query",
+)
+
 class PineconeRagAgent:
     def __init__(self, index_name: str, business_name: str):
         self.pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
@@ -21,6 +31,14 @@ class PineconeRagAgent:
         self.business_name = business_name
         self.embeddings_dimension = 1536
 
+    async def _query_index(self, **kwargs):
+        """Run ``self.index.query`` on the Pinecone pool, giving up after PINECONE_QUERY_TIMEOUT."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(_pinecone_executor, partial(self.index.query, **kwargs)),
+            timeout=PINECONE_QUERY_TIMEOUT,
+        )
+
     async def query_knowledge(self, query: str) -> str:
         user_embedding = await openai.create_embeddings(
             input=[query],
@@ -28,11 +46,15 @@ class PineconeRagAgent:
             dimensions=self.embeddings_dimension,
         )
 
-        query_response = self.index.query(
-            vector=user_embedding[0].embedding,
-            top_k=3,  # Get top 3 matches for better context
-            include_metadata=True
-        )
+        try:
+            query_response = await self._query_index(
+                vector=user_embedding[0].embedding,
+                top_k=3,  # Get top 3 matches for better context
+                include_metadata=True
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Pinecone query timed out after {PINECONE_QUERY_TIMEOUT}s")
+            return ''
 
         contexts = []
         for match in query_response.matches:
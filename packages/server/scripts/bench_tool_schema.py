@@ -0,0 +1,70 @@
+"""Micro-benchmark for the per-turn tools payload of the Cerebras plugin.
+
+Registers the template agent's calendar and RAG tools and compares rebuilding the
+JSON schema on every turn against the cached payload used by ``LLM.chat``.
+
+    python scripts/bench_tool_schema.py [turns]
+"""
+
+import os
+import sys
+import timeit
+from typing import Annotated
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from livekit.agents import llm  # noqa: E402
+
+from custom_plugins.cerebras_plugin.llm import (  # noqa: E402
+    _build_function_description,
+    _build_tools,
+)
+
+
+def build_fnc_ctx() -> llm.FunctionContext:
+    fnc_ctx = llm.FunctionContext()
+
+    @fnc_ctx.ai_callable(description="Query knowledge base for relevant information")
+    async def query_knowledge(query: str) -> str:
+        return ""
+
+    @fnc_ctx.ai_callable(description="Check calendar availability for a specific date and time")
+    async def check_calendar_availability(
+        time: Annotated[str, llm.TypeInfo(description="Time in natural format (2:30 pm, 4 pm)")] = None,
+        date: Annotated[str, llm.TypeInfo(description="Date in natural language (today, tomorrow, next Monday)")] = None
+    ) -> str:
+        return ""
+
+    @fnc_ctx.ai_callable(description="Schedule a new calendar event")
+    async def schedule_event(
+        title: Annotated[str, llm.TypeInfo(description="Title of the event")],
+        time: Annotated[str, llm.TypeInfo(description="Time in natural format (2:30 pm, 4 pm)")] = None,
+        date: Annotated[str, llm.TypeInfo(description="Date in natural language (today, tomorrow, next Monday)")] = None,
+        duration: Annotated[int, llm.TypeInfo(description="Duration in minutes")] = 60,
+        description: Annotated[str, llm.TypeInfo(description="Event description")] = ""
+    ) -> str:
+        return ""
+
+    return fnc_ctx
+
+
+def main() -> None:
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    fnc_ctx = build_fnc_ctx()
+
+    def rebuild():
+        return [_build_function_description(fnc) for fnc in fnc_ctx.ai_functions.values()]
+
+    assert rebuild() == _build_tools(fnc_ctx)
+
+    uncached = min(timeit.repeat(rebuild, number=turns, repeat=3)) / turns
+    cached = min(timeit.repeat(lambda: _build_tools(fnc_ctx), number=turns, repeat=3)) / turns
+
+    print(f"tools registered: {len(fnc_ctx.ai_functions)}")
+    print(f"rebuild per turn: {uncached * 1e6:.2f} us")
+    print(f"cached per turn:  {cached * 1e6:.2f} us")
+    print(f"speedup:          {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
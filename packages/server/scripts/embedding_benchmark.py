@@ -0,0 +1,174 @@
+"""Retrieval latency and recall of a local embedding model against the remote one.
+
+Runs a labelled query set through both embedding paths the template agent supports.
+Each model searches its own namespace, indexed with that model. Per query it times the
+end-to-end lookup (query embedding plus Pinecone query) and scores recall@k against
+the relevant document ids.
+
+    python scripts/embedding_benchmark.py --index knowledge \\
+        --corpus docs.jsonl --queries queries.jsonl \\
+        --local-model local/bge-small-en-v1.5 --ingest
+
+``docs.jsonl`` lines are ``{"id": ..., "text": ...}``, ``queries.jsonl`` lines are
+``{"query": ..., "relevant": [doc ids]}``. With --ingest the corpus is first upserted
+into ``<namespace>-remote`` and ``<namespace>-local``, otherwise both must exist.
+Local models are read from LOCAL_EMBEDDING_MODELS_DIR.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+from pinecone import Pinecone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "template-agent"))
+
+from embeddings import create_embeddings, embedding_dimensions  # noqa: E402
+
+logger = logging.getLogger("embedding-benchmark")
+
+INGEST_BATCH_SIZE = 64
+
+
+@dataclass
+class PathReport:
+    model: str
+    namespace: str
+    embed_ms: list[float] = field(default_factory=list)
+    query_ms: list[float] = field(default_factory=list)
+    total_ms: list[float] = field(default_factory=list)
+    recall: list[float] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        return {
+            "model": self.model,
+            "queries": len(self.total_ms),
+            "embed_p50_ms": _percentile(self.embed_ms, 50),
+            "query_p50_ms": _percentile(self.query_ms, 50),
+            "total_p50_ms": _percentile(self.total_ms, 50),
+            "total_p95_ms": _percentile(self.total_ms, 95),
+            "total_mean_ms": float(np.mean(self.total_ms)) if self.total_ms else 0.0,
+            "recall": float(np.mean(self.recall)) if self.recall else 0.0,
+        }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def _read_jsonl(path: str) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def ingest(index, model: str, namespace: str, docs: list[dict]) -> None:
+    dimensions = embedding_dimensions(model)
+    now = time.time()
+    for i in range(0, len(docs), INGEST_BATCH_SIZE):
+        batch = docs[i:i + INGEST_BATCH_SIZE]
+        vectors = await create_embeddings([doc["text"] for doc in batch], model=model, dimensions=dimensions)
+        index.upsert(
+            vectors=[
+                {"id": str(doc["id"]), "values": vector, "metadata": {"text": doc["text"], "timestamp": now}}
+                for doc, vector in zip(batch, vectors)
+            ],
+            namespace=namespace,
+        )
+    logger.info(f"Upserted {len(docs)} documents into {namespace} with {model}")
+
+
+async def run_path(index, model: str, namespace: str, queries: list[dict], top_k: int, warmup: int) -> PathReport:
+    report = PathReport(model, namespace)
+    dimensions = embedding_dimensions(model)
+
+    for n, item in enumerate(queries[:warmup] + queries):
+        started = time.perf_counter()
+        vector = (await create_embeddings([item["query"]], model=model, dimensions=dimensions))[0]
+        embedded = time.perf_counter()
+        response = index.query(vector=vector, top_k=top_k, namespace=namespace)
+        finished = time.perf_counter()
+        if n < warmup:
+            continue
+
+        relevant = {str(doc_id) for doc_id in item["relevant"]}
+        retrieved = {match.id for match in response.matches}
+        report.embed_ms.append((embedded - started) * 1000)
+        report.query_ms.append((finished - embedded) * 1000)
+        report.total_ms.append((finished - started) * 1000)
+        report.recall.append(len(relevant & retrieved) / len(relevant) if relevant else 1.0)
+
+    return report
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+    index = pc.Index(args.index, host=os.getenv("PINECONE_INDEX_HOST", ""))
+    queries = _read_jsonl(args.queries)
+    paths = [(args.remote_model, f"{args.namespace}-remote"), (args.local_model, f"{args.namespace}-local")]
+
+    if args.ingest:
+        docs = _read_jsonl(args.corpus)
+        for model, namespace in paths:
+            await ingest(index, model, namespace, docs)
+        # upserts become searchable asynchronously
+        await asyncio.sleep(args.settle)
+
+    reports = []
+    for model, namespace in paths:
+        report = await run_path(index, model, namespace, queries, args.top_k, args.warmup)
+        reports.append(report.summary())
+    return reports
+
+
+def print_table(reports: list[dict], top_k: int) -> None:
+    columns = [
+        ("embed p50", "embed_p50_ms"),
+        ("query p50", "query_p50_ms"),
+        ("total p50", "total_p50_ms"),
+        ("total p95", "total_p95_ms"),
+        ("mean", "total_mean_ms"),
+        (f"recall@{top_k}", "recall"),
+    ]
+    width = max(len(report["model"]) for report in reports)
+    print(f"{'model':<{width}} " + " ".join(f"{title:>10}" for title, _ in columns))
+    for report in reports:
+        print(f"{report['model']:<{width}} " + " ".join(
+            f"{report[key]:>10.3f}" if key == "recall" else f"{report[key]:>10.1f}"
+            for _, key in columns
+        ))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--index", required=True, help="Pinecone index name")
+    parser.add_argument("--namespace", default="embedding-benchmark", help="prefix of the per-model namespaces")
+    parser.add_argument("--corpus", help="documents to ingest, JSON lines with id and text")
+    parser.add_argument("--queries", required=True, help="JSON lines with query and relevant document ids")
+    parser.add_argument("--remote-model", default="text-embedding-3-small")
+    parser.add_argument("--local-model", required=True, help="e.g. local/bge-small-en-v1.5")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=3, help="untimed queries run first on each path")
+    parser.add_argument("--ingest", action="store_true", help="upsert the corpus before querying")
+    parser.add_argument("--settle", type=float, default=10.0, help="seconds to wait after ingesting")
+    parser.add_argument("--json", help="write the reports to this file")
+    args = parser.parse_args()
+    if args.ingest and not args.corpus:
+        parser.error("--ingest needs --corpus")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    reports = asyncio.run(run(args))
+    print_table(reports, args.top_k)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
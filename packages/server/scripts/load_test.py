@@ -0,0 +1,441 @@
+"""Concurrent-call load generator for the template agent.
+
+Ramps up simultaneous synthetic calls against a local LiveKit dev server. Each call
+joins its own room as a caller carrying the participant metadata of a SIP call,
+plays the recorded caller audio turn by turn and measures how long the agent takes
+to start answering. Per concurrency stage it reports the turn latencies, the CPU
+and RSS of the worker's process tree (jobs run in child processes) and the event
+loop lag the jobs publish when PUBLISH_LOOP_LAG=true.
+
+    livekit-server --dev
+    python scripts/load_test.py --audio caller.wav --stages 1,5,10,20 \\
+        --fakes --worker "python template-agent/agent.py start"
+
+The recording (16-bit PCM WAV) is split into turns at pauses of --pause seconds.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shlex
+import subprocess
+import sys
+import time
+import uuid
+import wave
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+import psutil
+from livekit import api, rtc
+
+logger = logging.getLogger("load-test")
+
+FRAME_MS = 10
+# int16 RMS above which audio counts as speech
+VOICE_RMS = 300
+
+
+@dataclass
+class CallResult:
+    turn_latencies: list[float] = field(default_factory=list)
+    missed_turns: int = 0
+    loop_lag_ms: list[float] = field(default_factory=list)
+    error: str | None = None
+
+
+@dataclass
+class StageReport:
+    concurrency: int
+    calls: list[CallResult]
+    cpu_percent: list[float]
+    rss_mb: list[float]
+    duration: float
+
+    def summary(self) -> dict:
+        latencies = [lat for call in self.calls for lat in call.turn_latencies]
+        lags = [lag for call in self.calls for lag in call.loop_lag_ms]
+        return {
+            "concurrency": self.concurrency,
+            "calls_failed": sum(1 for call in self.calls if call.error),
+            "turns": len(latencies),
+            "turns_missed": sum(call.missed_turns for call in self.calls),
+            "latency_p50_ms": _percentile(latencies, 50) * 1000,
+            "latency_p90_ms": _percentile(latencies, 90) * 1000,
+            "latency_p99_ms": _percentile(latencies, 99) * 1000,
+            "cpu_mean_percent": float(np.mean(self.cpu_percent)) if self.cpu_percent else 0.0,
+            "cpu_max_percent": max(self.cpu_percent, default=0.0),
+            "rss_max_mb": max(self.rss_mb, default=0.0),
+            "loop_lag_p99_ms": _percentile(lags, 99),
+            "loop_lag_max_ms": max(lags, default=0.0),
+            "duration_s": self.duration,
+        }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def _rms(samples: np.ndarray) -> float:
+    if len(samples) == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+
+
+def load_turns(path: str, pause: float) -> tuple[int, int, list[np.ndarray]]:
+    """Split a recording into caller turns at pauses of at least ``pause`` seconds."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError("caller audio must be 16-bit PCM")
+        sample_rate, channels = wav.getframerate(), wav.getnchannels()
+        audio = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+    frame = sample_rate * FRAME_MS // 1000 * channels
+    turns, start, end = [], None, 0
+    for i in range(0, len(audio), frame):
+        if _rms(audio[i:i + frame]) >= VOICE_RMS:
+            if start is None:
+                start = i
+            end = i + frame
+        elif start is not None and (i - end) / frame * FRAME_MS / 1000 >= pause:
+            turns.append(audio[start:end])
+            start = None
+    if start is not None:
+        turns.append(audio[start:end])
+
+    return sample_rate, channels, turns
+
+
+class Microphone:
+    """Publishes caller audio in real time, silence between turns so the agent's VAD sees the pause."""
+
+    def __init__(self, sample_rate: int, channels: int) -> None:
+        self.source = rtc.AudioSource(sample_rate, channels)
+        self._sample_rate = sample_rate
+        self._channels = channels
+        self._samples_per_frame = sample_rate * FRAME_MS // 1000
+        self._pending: deque[np.ndarray] = deque()
+        self._done: asyncio.Future | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def play(self, audio: np.ndarray) -> float:
+        """Queue ``audio`` and return the time its last frame was sent."""
+        frame = self._samples_per_frame * self._channels
+        self._pending = deque(audio[i:i + frame] for i in range(0, len(audio), frame))
+        self._done = asyncio.get_running_loop().create_future()
+        return await self._done
+
+    async def _run(self) -> None:
+        frame_len = self._samples_per_frame * self._channels
+        silence = np.zeros(frame_len, dtype=np.int16)
+        next_frame = time.perf_counter()
+        while True:
+            if self._pending:
+                data = self._pending.popleft()
+                if len(data) < frame_len:
+                    data = np.concatenate([data, silence[len(data):]])
+            else:
+                data = silence
+
+            await self.source.capture_frame(
+                rtc.AudioFrame(data.tobytes(), self._sample_rate, self._channels, self._samples_per_frame)
+            )
+            if not self._pending and self._done is not None and not self._done.done():
+                self._done.set_result(time.perf_counter())
+
+            next_frame += FRAME_MS / 1000
+            await asyncio.sleep(max(0.0, next_frame - time.perf_counter()))
+
+
+class AgentListener:
+    """Tracks when the agent's audio track carries speech."""
+
+    def __init__(self) -> None:
+        self.track_ready = asyncio.Event()
+        self.last_voice = 0.0
+        self._voice_onsets: list[float] = []
+        self._voice = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def attach(self, track: rtc.Track) -> None:
+        self._task = asyncio.create_task(self._run(rtc.AudioStream(track)))
+        self.track_ready.set()
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def wait_for_voice_after(self, t: float, timeout: float) -> float | None:
+        deadline = time.perf_counter() + timeout
+        while True:
+            onsets = [onset for onset in self._voice_onsets if onset >= t]
+            if onsets:
+                return onsets[0]
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+            self._voice.clear()
+            try:
+                await asyncio.wait_for(self._voice.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    async def wait_for_silence(self, silence: float, timeout: float) -> None:
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            if time.perf_counter() - self.last_voice >= silence:
+                return
+            await asyncio.sleep(0.05)
+
+    async def _run(self, stream: rtc.AudioStream) -> None:
+        speaking = False
+        async for ev in stream:
+            now = time.perf_counter()
+            if _rms(np.frombuffer(ev.frame.data, dtype=np.int16)) >= VOICE_RMS:
+                if not speaking:
+                    self._voice_onsets.append(now)
+                    self._voice.set()
+                speaking = True
+                self.last_voice = now
+            elif now - self.last_voice > 0.3:
+                speaking = False
+
+
+async def run_call(
+    args: argparse.Namespace,
+    lkapi: api.LiveKitAPI,
+    room_name: str,
+    sample_rate: int,
+    channels: int,
+    turns: list[np.ndarray],
+) -> CallResult:
+    result = CallResult()
+    room = rtc.Room()
+    listener = AgentListener()
+    mic = Microphone(sample_rate, channels)
+
+    @room.on("track_subscribed")
+    def _on_track_subscribed(track: rtc.Track, publication, participant):
+        if track.kind == rtc.TrackKind.KIND_AUDIO:
+            listener.attach(track)
+
+    @room.on("participant_attributes_changed")
+    def _on_attributes_changed(changed: dict, participant):
+        if "loop_lag_ms" in changed:
+            result.loop_lag_ms.append(float(changed["loop_lag_ms"]))
+
+    metadata = {
+        "agentId": args.agent_id,
+        "userId": args.user_id,
+        "businessName": "Load Test",
+        "initiateConversation": False,
+        "documentNamespace": args.namespace,
+        "googleCalendarIntegration": args.calendar,
+    }
+    token = (
+        api.AccessToken(args.api_key, args.api_secret)
+        .with_identity(f"caller-{room_name}")
+        .with_metadata(json.dumps(metadata))
+        .with_grants(api.VideoGrants(room_join=True, room=room_name))
+        .to_jwt()
+    )
+
+    try:
+        await room.connect(args.url, token)
+        track = rtc.LocalAudioTrack.create_audio_track("caller", mic.source)
+        await room.local_participant.publish_track(
+            track, rtc.TrackPublishOptions(source=rtc.TrackSource.SOURCE_MICROPHONE)
+        )
+        mic.start()
+        await asyncio.wait_for(listener.track_ready.wait(), args.join_timeout)
+
+        for turn in turns:
+            await listener.wait_for_silence(args.settle, args.turn_timeout)
+            sent = await mic.play(turn)
+            onset = await listener.wait_for_voice_after(sent, args.turn_timeout)
+            if onset is None:
+                result.missed_turns += 1
+            else:
+                result.turn_latencies.append(onset - sent)
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+        logger.error(f"Call {room_name} failed: {result.error}")
+    finally:
+        await mic.aclose()
+        await listener.aclose()
+        await room.disconnect()
+        try:
+            await lkapi.room.delete_room(api.DeleteRoomRequest(room=room_name))
+        except Exception as e:
+            logger.debug(f"Error deleting room {room_name}: {str(e)}")
+
+    return result
+
+
+async def sample_worker(pid: int, cpu: list[float], rss: list[float], interval: float = 1.0) -> None:
+    """CPU and RSS of the worker and all its job processes."""
+    root = psutil.Process(pid)
+    procs: dict[int, psutil.Process] = {}
+    while True:
+        try:
+            current = [root] + root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+
+        total_cpu, total_rss = 0.0, 0
+        for proc in current:
+            known = procs.setdefault(proc.pid, proc)
+            try:
+                total_cpu += known.cpu_percent()
+                total_rss += known.memory_info().rss
+            except psutil.NoSuchProcess:
+                procs.pop(proc.pid, None)
+
+        cpu.append(total_cpu)
+        rss.append(total_rss / 1e6)
+        await asyncio.sleep(interval)
+
+
+def start_fakes(base_port: int) -> tuple[subprocess.Popen, dict[str, str]]:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "fake_providers", "--base-port", str(base_port)],
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    env = {}
+    # the exports end with a blank line
+    for line in proc.stdout:
+        if not line.strip():
+            break
+        key, value = line.removeprefix("export ").strip().split("=", 1)
+        env[key] = value
+    if not env:
+        raise RuntimeError("fake providers exited before printing their environment")
+    return proc, env
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    sample_rate, channels, turns = load_turns(args.audio, args.pause)
+    turns = turns[: args.max_turns] if args.max_turns else turns
+    logger.info(f"Loaded {len(turns)} caller turns from {args.audio}")
+
+    children: list[subprocess.Popen] = []
+    worker_pid = args.worker_pid
+    env = dict(os.environ)
+    try:
+        if args.fakes:
+            fakes, fake_env = start_fakes(args.fakes_port)
+            children.append(fakes)
+            env.update(fake_env)
+
+        if args.worker:
+            env.update(
+                LIVEKIT_URL=args.url,
+                LIVEKIT_API_KEY=args.api_key,
+                LIVEKIT_API_SECRET=args.api_secret,
+                PUBLISH_LOOP_LAG="true",
+            )
+            worker = subprocess.Popen(shlex.split(args.worker), env=env)
+            children.append(worker)
+            worker_pid = worker.pid
+            await asyncio.sleep(args.worker_startup)
+
+        reports = []
+        run_id = uuid.uuid4().hex[:6]
+        async with api.LiveKitAPI(args.url, args.api_key, args.api_secret) as lkapi:
+            for concurrency in args.stages:
+                cpu: list[float] = []
+                rss: list[float] = []
+                sampler = asyncio.create_task(sample_worker(worker_pid, cpu, rss)) if worker_pid else None
+
+                started = time.perf_counter()
+                calls = []
+                for i in range(concurrency):
+                    calls.append(asyncio.create_task(run_call(
+                        args, lkapi, f"loadtest-{run_id}-{concurrency}-{i}", sample_rate, channels, turns
+                    )))
+                    await asyncio.sleep(args.spawn_interval)
+                results = await asyncio.gather(*calls)
+
+                if sampler is not None:
+                    sampler.cancel()
+
+                report = StageReport(concurrency, results, cpu, rss, time.perf_counter() - started)
+                reports.append(report.summary())
+                logger.info(f"Stage {concurrency} calls: {report.summary()}")
+
+        return reports
+    finally:
+        for proc in reversed(children):
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+def print_table(reports: list[dict]) -> None:
+    columns = [
+        ("calls", "concurrency"),
+        ("failed", "calls_failed"),
+        ("turns", "turns"),
+        ("missed", "turns_missed"),
+        ("p50 ms", "latency_p50_ms"),
+        ("p90 ms", "latency_p90_ms"),
+        ("p99 ms", "latency_p99_ms"),
+        ("cpu %", "cpu_mean_percent"),
+        ("rss MB", "rss_max_mb"),
+        ("lag p99", "loop_lag_p99_ms"),
+        ("lag max", "loop_lag_max_ms"),
+    ]
+    print(" ".join(f"{title:>8}" for title, _ in columns))
+    for report in reports:
+        print(" ".join(
+            f"{report[key]:>8.0f}" if isinstance(report[key], float) else f"{report[key]:>8}"
+            for _, key in columns
+        ))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--audio", required=True, help="recorded caller audio, 16-bit PCM WAV")
+    parser.add_argument("--stages", default="1,2,5,10", type=lambda s: [int(x) for x in s.split(",")])
+    parser.add_argument("--url", default=os.getenv("LIVEKIT_URL", "ws://localhost:7880"))
+    parser.add_argument("--api-key", default=os.getenv("LIVEKIT_API_KEY", "devkey"))
+    parser.add_argument("--api-secret", default=os.getenv("LIVEKIT_API_SECRET", "secret"))
+    parser.add_argument("--worker", help="command starting the agent worker, e.g. 'python template-agent/agent.py start'")
+    parser.add_argument("--worker-pid", type=int, help="pid of an already running worker to sample")
+    parser.add_argument("--worker-startup", type=float, default=10.0, help="seconds to wait for the worker to register")
+    parser.add_argument("--fakes", action="store_true", help="run the providers from fake_providers")
+    parser.add_argument("--fakes-port", type=int, default=9100)
+    parser.add_argument("--pause", type=float, default=0.7, help="silence that separates caller turns")
+    parser.add_argument("--max-turns", type=int, default=0)
+    parser.add_argument("--settle", type=float, default=1.0, help="agent silence awaited before the next turn")
+    parser.add_argument("--turn-timeout", type=float, default=15.0)
+    parser.add_argument("--join-timeout", type=float, default=30.0)
+    parser.add_argument("--spawn-interval", type=float, default=0.2, help="delay between call starts within a stage")
+    parser.add_argument("--agent-id", default="loadtest")
+    parser.add_argument("--user-id", default="loadtest")
+    parser.add_argument("--namespace", default="", help="document namespace, enables RAG")
+    parser.add_argument("--calendar", action="store_true", help="enable the calendar tools")
+    parser.add_argument("--json", help="write the stage reports to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    reports = asyncio.run(run(args))
+    print_table(reports)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
@@ -3,6 +3,8 @@ import logging
 import os
 import json
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pinecone import Pinecone
 from livekit.plugins import openai
 
@@ -20,9 +22,18 @@ from livekit.agents import (
 from livekit.agents.pipeline import VoicePipelineAgent
 from livekit.plugins import deepgram, silero, turn_detector, cartesia
 from custom_plugins import cerebras_plugin as cerebras
+from context_manager import ChatContextManager
+from embeddings import create_embeddings, embedding_dimensions, get_embedding_batcher, load_embedding_model
+from index_schema import INGEST_SOURCE
+from local_embeddings import get_local_model, is_local_model
+from local_index import get_local_index
+from loop_monitor import LoopLagMonitor
+from rag_cache import get_rag_cache, get_semantic_cache
+from speculative_rag import SpeculativeRetriever, TranscriptTapSTT
 
 from typing import Annotated
 import dateparser
+from calendar_cache import SLOT_SEARCH_MAX_COUNT, SLOT_SEARCH_MAX_DAYS, CalendarWindow
 from agent_helpers import (
     _check_calendar_availability,
     _create_calendar_event,
@@ -34,15 +45,40 @@ from agent_helpers import (
 load_dotenv()
 logger = logging.getLogger("voice-assistant")
 
+# Pinecone's client is blocking, queries run on a bounded pool off the event loop
+PINECONE_QUERY_TIMEOUT = float(os.getenv('PINECONE_QUERY_TIMEOUT', '2.0'))
+_pinecone_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('PINECONE_QUERY_WORKERS', '8')),
+    thread_name_prefix="pinecone-query",
+)
+# Answer queries from an on-disk annoy replica of the index once it has been synced
+RAG_LOCAL_INDEX = os.getenv('RAG_LOCAL_INDEX', 'false').lower() == 'true'
+# Start knowledge base lookups from interim transcripts, before the LLM asks for them
+SPECULATIVE_RAG = os.getenv('SPECULATIVE_RAG', 'true').lower() == 'true'
+# Query embedding model, agents can pick their own, e.g. local/bge-small-en-v1.5 for a namespace indexed with it
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
+
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
 class PineconeRagAgent:
-    def __init__(self, index_name: str):
+    def __init__(self, index_name: str, embedding_model: str = EMBEDDING_MODEL):
         self.pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-        self.index = self.pc.Index(index_name)
-        self.embeddings_dimension = 1536
-        self.cache = {}
+        # PINECONE_INDEX_HOST skips the describe_index lookup, e.g. for a local stand-in
+        self.index = self.pc.Index(index_name, host=os.getenv("PINECONE_INDEX_HOST", ""))
+        self.embedding_model = embedding_model
+        self.embeddings_dimension = embedding_dimensions(embedding_model)
+        self.cache = get_rag_cache(index_name)
+        self.semantic_cache = get_semantic_cache(index_name, self.embeddings_dimension)
+        self.local_index = get_local_index(index_name, "", self.embeddings_dimension) if RAG_LOCAL_INDEX else None
         
+    async def _query_index(self, **kwargs):
+        """Run ``self.index.query`` on the Pinecone pool, giving up after PINECONE_QUERY_TIMEOUT."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(_pinecone_executor, partial(self.index.query, **kwargs)),
+            timeout=PINECONE_QUERY_TIMEOUT,
+        )
+
     async def should_use_rag(self, query: str) -> bool:
         domain_keywords = [
             "company", "product", "policy", "specific", "detail", 
@@ -55,35 +91,59 @@ class PineconeRagAgent:
             return ''
             
         cache_key = query.lower()
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            user_embedding = await openai.create_embeddings(
+            user_embedding = await create_embeddings(
                 input=[query],
-                model="text-embedding-3-small",
+                model=self.embedding_model,
                 dimensions=self.embeddings_dimension,
             )
 
-            query_response = self.index.query(
-                vector=user_embedding[0].embedding,
-                top_k=3,
-                include_metadata=True,
-                filter={
-                    "timestamp": {"$gte": (datetime.now() - timedelta(days=30)).timestamp()}
-                }
-            )
+            # Paraphrases of an earlier query reuse its result
+            cached = self.semantic_cache.get(user_embedding[0])
+            if cached is not None:
+                self.cache.put(cache_key, cached)
+                return cached
+
+            min_timestamp = (datetime.now() - timedelta(days=30)).timestamp()
+            if self.local_index is not None:
+                self.local_index.ensure_fresh(self.index)
+
+            # Pinecone only serves the queries that arrive before the replica is warm
+            if self.local_index is not None and self.local_index.ready:
+                matches = self.local_index.query(user_embedding[0], top_k=3, min_timestamp=min_timestamp)
+            else:
+                query_response = await self._query_index(
+                    vector=user_embedding[0],
+                    top_k=3,
+                    include_metadata=True,
+                    filter={
+                        "$or": [
+                            {"timestamp": {"$gte": min_timestamp}},
+                            # kept current by the ingestion CLI, not by age
+                            {"source": INGEST_SOURCE},
+                        ]
+                    }
+                )
+                matches = [(match.score, match.metadata) for match in query_response.matches]
 
             contexts = []
-            for match in query_response.matches:
-                if match.score > 0.8:
-                    contexts.append(match.metadata.get('text', ''))
+            for score, metadata in matches:
+                if score > 0.8:
+                    contexts.append(metadata.get('text', ''))
             
             result = "\n".join(contexts) if contexts else ''
             
-            self.cache[cache_key] = result
+            self.cache.put(cache_key, result)
+            self.semantic_cache.put(user_embedding[0], result)
             return result
             
+        except asyncio.TimeoutError:
+            logger.warning(f"Pinecone query timed out after {PINECONE_QUERY_TIMEOUT}s")
+            return ''
         except Exception as e:
             logger.error(f"Error in query_knowledge: {str(e)}")
             return ''
@@ -96,6 +156,18 @@ def prewarm(proc: JobProcess):
         logger.error(f"Error loading VAD model: {str(e)}")
         raise
 
+    # Shared by every job in this process, connection setup stays off the first turn
+    try:
+        cerebras.prewarm_client()
+    except Exception as e:
+        logger.error(f"Error prewarming Cerebras client: {str(e)}")
+
+    if is_local_model(EMBEDDING_MODEL):
+        try:
+            get_local_model(EMBEDDING_MODEL)
+        except Exception as e:
+            logger.error(f"Error loading local embedding model: {str(e)}")
+
 @llm.ai_callable()
 async def check_calendar(
     self,
@@ -184,6 +256,7 @@ async def entrypoint(ctx: JobContext):
         initiate_conversation = metadata.get('initiateConversation', False)
         initial_message = metadata.get('initialMessage', "Hey, how can I help you today?")
         document_namespace = metadata.get('documentNamespace', '')
+        embedding_model = metadata.get('embeddingModel', '') or EMBEDDING_MODEL
         google_calendar_enabled = metadata.get('googleCalendarIntegration', False) or os.getenv('GOOGLE_CALENDAR_ENABLED') == 'true'
         voice_id = metadata.get('voiceId', '') or os.getenv('VOICE_ID')
         voice_name = metadata.get('voiceName', '') or os.getenv('VOICE_NAME')
@@ -228,15 +301,32 @@ async def entrypoint(ctx: JobContext):
 
         # Initialize RAG if document namespace is provided
         rag_agent = None
+        speculator = None
         if document_namespace:
-            rag_agent = PineconeRagAgent(document_namespace)
+            # an agent's own local model isn't preloaded by prewarm, keep loading it off the loop
+            await load_embedding_model(embedding_model)
+            rag_agent = PineconeRagAgent(document_namespace, embedding_model)
+            if rag_agent.local_index is not None:
+                # start the sync at call setup rather than on the first question
+                rag_agent.local_index.ensure_fresh(rag_agent.index)
+            if SPECULATIVE_RAG:
+                speculator = SpeculativeRetriever(rag_agent)
             
             @fnc_ctx.ai_callable(description="Query knowledge base for relevant information")
             async def query_knowledge(query: str) -> str:
+                if speculator is not None:
+                    result = await speculator.lookup(query)
+                    if result:
+                        return result
                 return await rag_agent.query_knowledge(query)
 
         # Only add calendar functions if enabled
+        calendar_window = None
         if google_calendar_enabled:
+            # the next days of the calendar are fetched once, availability is answered from memory
+            calendar_window = CalendarWindow(agent_id, user_id)
+            calendar_window.start()
+
             @fnc_ctx.ai_callable(description="Check calendar availability for a specific date and time")
             async def check_calendar_availability(
                 time: Annotated[str, llm.TypeInfo(description="Time in natural format (2:30 pm, 4 pm)")] = None,
@@ -256,7 +346,7 @@ async def entrypoint(ctx: JobContext):
                         except ValueError as e:
                             return f"Invalid time format: {time}. Please use format like '4 pm' or '2:30 pm {e}'"
                     
-                    events = await _check_calendar_availability(date, agent_id=agent_id, user_id=user_id)
+                    events = await calendar_window.events_on(date)
                     formatted_date = format_date_for_display(parse_natural_date(date))
                     
                     if not events:
@@ -287,6 +377,31 @@ async def entrypoint(ctx: JobContext):
                     logger.error(f"Error checking calendar: {str(e)}")
                     return "Sorry, I had trouble checking your calendar."
 
+            @fnc_ctx.ai_callable(description="Find the next open slots in the calendar, use when asked for the next availability")
+            async def find_available_slots(
+                duration: Annotated[int, llm.TypeInfo(description="Duration in minutes")] = 60,
+                date: Annotated[str, llm.TypeInfo(description="First date to search from in natural language (today, tomorrow, next Monday)")] = None,
+                count: Annotated[int, llm.TypeInfo(description="Number of slots to offer")] = 3,
+                days: Annotated[int, llm.TypeInfo(description="Number of days to search")] = 7
+            ) -> str:
+                if duration is None or duration <= 0:
+                    return "Please give the length of the appointment in minutes"
+                count = max(min(count or 3, SLOT_SEARCH_MAX_COUNT), 1)
+                days = max(min(days or 7, SLOT_SEARCH_MAX_DAYS), 1)
+
+                try:
+                    slots = await calendar_window.find_available_slots(date or current_date, duration, count, days)
+                    if not slots:
+                        return f"No {duration} minute openings in the next {days} days"
+
+                    return "Next openings:\n" + "\n".join(
+                        f"{format_date_for_display(start.strftime('%Y-%m-%d'))} at {format_time_for_display(start.strftime('%H:%M'))}"
+                        for start, _ in slots
+                    )
+                except Exception as e:
+                    logger.error(f"Error finding available slots: {str(e)}")
+                    return "Sorry, I had trouble checking your calendar."
+
             @fnc_ctx.ai_callable(description="Schedule a new calendar event")
             async def schedule_event(
                 title: Annotated[str, llm.TypeInfo(description="Title of the event")],
@@ -314,7 +429,7 @@ async def entrypoint(ctx: JobContext):
                     requested_start = datetime.strptime(f"{formatted_date} {time}", '%Y-%m-%d %H:%M').replace(tzinfo=local_tz)
                     requested_end = requested_start + timedelta(minutes=duration)
                     
-                    events = await _check_calendar_availability(formatted_date, agent_id=agent_id, user_id=user_id)
+                    events = await calendar_window.events_on(formatted_date)
                     
                     for event in events:
                         event_start = datetime.fromisoformat(event['start'].get('dateTime', event['start'].get('date'))).replace(tzinfo=local_tz)
@@ -323,7 +438,9 @@ async def entrypoint(ctx: JobContext):
                         if (requested_start < event_end and requested_end > event_start):
                             return f"Cannot schedule. Conflicts with: {event['summary']} ({event_start.strftime('%I:%M %p').lstrip('0').lower()} - {event_end.strftime('%I:%M %p').lstrip('0').lower()})"
                     
-                    await _create_calendar_event(formatted_date, time, duration, title, description, agent_id=agent_id, user_id=user_id)
+                    event = await _create_calendar_event(formatted_date, time, duration, title, description, agent_id=agent_id, user_id=user_id)
+                    if event:
+                        calendar_window.add(event)
                     display_date = format_date_for_display(formatted_date)
                     display_time = format_time_for_display(time)
                     return f"Scheduled: {title} for {display_time} {display_date}"
@@ -342,26 +459,75 @@ async def entrypoint(ctx: JobContext):
                 "voice_id": voice_id,
                 "voice_name": voice_name
             }
+        # Provider endpoints can be overridden, e.g. to run against the local fakes
+        if os.getenv('CARTESIA_BASE_URL'):
+            tts_config["base_url"] = os.getenv('CARTESIA_BASE_URL')
+
+        stt_config = {}
+        if os.getenv('DEEPGRAM_BASE_URL'):
+            stt_config["base_url"] = os.getenv('DEEPGRAM_BASE_URL')
+
+        agent_llm = cerebras.LLM(
+            temperature=0.5,
+            parallel_tool_calls=True,
+            fnc_timeout=8.0,
+            agent_id=agent_id,
+        )
+        # Hedge slow first tokens to a second provider when one is configured
+        if os.getenv('GROQ_API_KEY'):
+            agent_llm = cerebras.HedgedLLM(
+                agent_llm,
+                openai.LLM.with_groq(model="llama-3.1-8b-instant", temperature=0.5),
+                hedge_after=float(os.getenv('LLM_HEDGE_AFTER', '0.5')),
+            )
+
+        # Keep long calls within the token budget, older turns are summarized in the background
+        context_manager = ChatContextManager(
+            # reported apart from the agent's own turns in the latency histograms
+            cerebras.LLM(temperature=0.2, agent_id=f"{agent_id}:summary", max_tokens=256),
+            max_tokens=int(os.getenv('CHAT_CONTEXT_MAX_TOKENS', '2000')),
+            keep_turns=int(os.getenv('CHAT_CONTEXT_KEEP_TURNS', '6')),
+        )
+
+        agent_stt = deepgram.STT(
+            model=dg_model,
+            interim_results=True,
+            smart_format=True,
+            **stt_config,
+        )
+        if speculator is not None:
+            agent_stt = TranscriptTapSTT(agent_stt, on_event=speculator.on_speech_event)
 
         agent = VoicePipelineAgent(
             vad=ctx.proc.userdata["vad"],
-            stt=deepgram.STT(
-                model=dg_model,
-                interim_results=True,
-                smart_format=True,
-            ),
-            llm=cerebras.LLM(
-                temperature=0.5,
-            ),
+            stt=agent_stt,
+            llm=agent_llm,
             tts=cartesia.TTS(**tts_config),
             turn_detector=turn_detector.EOUModel(),
             chat_ctx=initial_ctx,
             fnc_ctx=fnc_ctx,
+            before_llm_cb=context_manager.before_llm_cb,
         )
 
         agent.start(ctx.room, participant)
         logger.info(f"Agent {agent_id} started successfully for {business_name}")
 
+        # Event loop lag of this job, published as a participant attribute for load tests
+        publish_tasks = set()
+
+        def _publish_loop_lag(lag: float):
+            task = asyncio.create_task(
+                ctx.room.local_participant.set_attributes({"loop_lag_ms": f"{lag * 1000:.1f}"})
+            )
+            publish_tasks.add(task)
+            task.add_done_callback(publish_tasks.discard)
+
+        loop_monitor = LoopLagMonitor(
+            interval=1.0,
+            on_sample=_publish_loop_lag if os.getenv('PUBLISH_LOOP_LAG') == 'true' else None,
+        )
+        loop_monitor.start()
+
         usage_collector = metrics.UsageCollector()
 
         @agent.on("metrics_collected")
@@ -369,17 +535,41 @@ async def entrypoint(ctx: JobContext):
             metrics.log_metrics(mtrcs)
             usage_collector.collect(mtrcs)
 
+            if isinstance(mtrcs, metrics.LLMMetrics):
+                timings = cerebras.llm_latency.get_timings(mtrcs.request_id)
+                if timings:
+                    logger.info(
+                        f"LLM latency for agent {agent_id}: ttfb={timings.ttfb}, ttft={timings.ttft}, "
+                        f"max_token_gap={timings.max_token_gap}, duration={timings.duration}"
+                    )
+
         async def log_usage():
             summary = usage_collector.get_summary()
             logger.info(f"Usage for agent {agent_id}: ${summary}")
+            logger.info(f"LLM latency for agent {agent_id}: {cerebras.llm_latency.summary(agent_id=agent_id)}")
+            logger.info(f"Summarizer latency for agent {agent_id}: {cerebras.llm_latency.summary(agent_id=f'{agent_id}:summary')}")
+            logger.info(f"Event loop lag for agent {agent_id}: {loop_monitor.summary()}")
+            if rag_agent:
+                logger.info(f"RAG cache for agent {agent_id}: {rag_agent.cache.stats()}")
+                logger.info(f"RAG semantic cache for agent {agent_id}: {rag_agent.semantic_cache.stats()}")
+                batcher = get_embedding_batcher(rag_agent.embedding_model, rag_agent.embeddings_dimension)
+                logger.info(f"Embedding batcher for agent {agent_id}: {batcher.stats()}")
+            if speculator:
+                logger.info(f"Speculative RAG for agent {agent_id}: {speculator.stats()}")
+            if calendar_window:
+                logger.info(f"Calendar window for agent {agent_id}: {calendar_window.stats()}")
+            await loop_monitor.aclose()
 
         ctx.add_shutdown_callback(log_usage)
+        # a job process runs one job at a time, its keepalive must not outlive the job
+        ctx.add_shutdown_callback(cerebras.aclose_clients)
 
         chat = rtc.ChatManager(ctx.room)
 
         async def answer_from_text(txt: str):
             chat_ctx = agent.chat_ctx.copy()
             chat_ctx.append(role="user", text=txt)
+            context_manager.trim(chat_ctx)
             stream = agent.llm.chat(chat_ctx=chat_ctx)
             await agent.say(stream)
 
@@ -1,90 +1,20 @@
 import logging
-import os
 from datetime import datetime, timedelta
-from google.oauth2.credentials import Credentials
-# from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 import dateparser
 import time
-
-# import fetch
-# import json
+from calendar_client import get_calendar_client
+from calendar_credentials import get_calendar_credentials
 
 logger = logging.getLogger("voice-assistant")
-SCOPES = ['https://www.googleapis.com/auth/calendar']
 
 async def get_google_calendar_creds(agent_id: str, user_id: str):
-    """Get Google Calendar credentials from environment variables."""
+    """Get Google Calendar credentials, cached and refreshed ahead of expiry."""
     try:
-        if not os.getenv('GOOGLE_CALENDAR_ENABLED') == 'true':
-            logger.error("Google Calendar is not enabled for this agent")
-            return None
-
-        if not all([
-            os.getenv('GOOGLE_CALENDAR_ACCESS_TOKEN'),
-            os.getenv('GOOGLE_CALENDAR_REFRESH_TOKEN'),
-            os.getenv('GOOGLE_CALENDAR_EXPIRES_AT')
-        ]):
-            logger.error("Missing required Google Calendar environment variables")
-            return None
-            
-        # Create credentials object from environment variables
-        creds = Credentials(
-            token=os.getenv('GOOGLE_CALENDAR_ACCESS_TOKEN'),
-            refresh_token=os.getenv('GOOGLE_CALENDAR_REFRESH_TOKEN'),
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=os.getenv("GOOGLE_CLIENT_ID"),
-            client_secret=os.getenv("GOOGLE_CLIENT_SECRET"),
-            scopes=SCOPES,
-            expiry=datetime.fromisoformat(os.getenv('GOOGLE_CALENDAR_EXPIRES_AT'))
-        )
-        
-        # Check if credentials need refresh
-        # if creds.expired:
-        #     try:
-        #         creds.refresh(Request())
-        #         # Update stored tokens in database via API
-        #         await update_calendar_tokens(
-        #             agent_id,
-        #             user_id,
-        #             creds.token,
-        #             creds.refresh_token,
-        #             creds.expiry
-        #         )
-        #     except Exception as e:
-        #         logger.error(f"Error refreshing token: {e}")
-        #         return None
-                
-        return creds
+        return await get_calendar_credentials(agent_id, user_id).get()
     except Exception as e:
         logger.error(f"Error getting calendar credentials: {e}")
         return None
 
-# async def update_calendar_tokens(agent_id: str, user_id: str, access_token: str, refresh_token: str, expires_at: datetime):
-#     """Update calendar tokens in the database via API."""
-#     try:
-#         response = await fetch(f"{os.getenv('GRAHAM_API_URL')}/api/calendar/update-tokens", {
-#             "method": "POST",
-#             "headers": {
-#                 "Content-Type": "application/json",
-#                 "Authorization": f"Bearer {os.getenv('GRAHAM_API_KEY')}"
-#             },
-#             "body": json.dumps({
-#                 "agentId": agent_id,
-#                 "userId": user_id,
-#                 "accessToken": access_token,
-#                 "refreshToken": refresh_token,
-#                 "expiresAt": expires_at.isoformat()
-#             })
-#         })
-        
-#         if not response.ok:
-#             raise Exception("Failed to update calendar tokens")
-            
-#     except Exception as e:
-#         logger.error(f"Error updating calendar tokens: {e}")
-#         raise
-
 async def _check_calendar_availability(date: str, agent_id: str = None, user_id: str = None) -> list:
     """Internal function to check calendar availability."""
     try:
@@ -99,21 +29,13 @@ async def _check_calendar_availability(date: str, agent_id: str = None, user_id:
             logger.error("Failed to get Google Calendar credentials")
             return []
             
-        service = build('calendar', 'v3', credentials=creds)
+        client = get_calendar_client(creds)
         
         date_obj = datetime.strptime(formatted_date, '%Y-%m-%d')
         time_min = date_obj.isoformat() + 'Z'
         time_max = (date_obj + timedelta(days=1)).isoformat() + 'Z'
         
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        return events_result.get('items', [])
+        return await client.list_events(time_min, time_max)
     except Exception as e:
         logger.error(f"Error in _check_calendar_availability: {str(e)}")
         raise
@@ -130,7 +52,7 @@ async def _create_calendar_event(date: str, time: str, duration: int, title: str
             logger.error("Failed to get Google Calendar credentials")
             return None
             
-        service = build('calendar', 'v3', credentials=creds)
+        client = get_calendar_client(creds)
         
         local_tz = datetime.now().astimezone().tzinfo
         
@@ -150,7 +72,7 @@ async def _create_calendar_event(date: str, time: str, duration: int, title: str
             },
         }
         
-        return service.events().insert(calendarId='primary', body=event).execute()
+        return await client.insert_event(event)
     except Exception as e:
         logger.error(f"Error creating calendar event: {str(e)}")
         raise
@@ -0,0 +1,238 @@
+import asyncio
+import bisect
+import logging
+import os
+import time
+from datetime import date as Date, datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from agent_helpers import _check_calendar_availability, get_google_calendar_creds, parse_natural_date
+from calendar_client import get_calendar_client
+
+logger = logging.getLogger("voice-assistant")
+
+CALENDAR_WINDOW_DAYS = int(os.getenv('CALENDAR_WINDOW_DAYS', '14'))
+# A window older than this is refetched in the background, bookings made elsewhere show up
+CALENDAR_WINDOW_TTL = float(os.getenv('CALENDAR_WINDOW_TTL', '300'))
+# Bookable hours in the agent's local time, days as weekday numbers with Monday 0
+BUSINESS_HOURS_START = os.getenv('BUSINESS_HOURS_START', '09:00')
+BUSINESS_HOURS_END = os.getenv('BUSINESS_HOURS_END', '17:00')
+BUSINESS_DAYS = os.getenv('BUSINESS_DAYS', '0,1,2,3,4')
+# Offered slots start on multiples of this many minutes
+SLOT_STEP_MINUTES = int(os.getenv('SLOT_STEP_MINUTES', '15'))
+# Limits of one slot search, days past the window cost a Calendar API call each
+SLOT_SEARCH_MAX_DAYS = int(os.getenv('SLOT_SEARCH_MAX_DAYS', '31'))
+SLOT_SEARCH_MAX_COUNT = int(os.getenv('SLOT_SEARCH_MAX_COUNT', '10'))
+
+
+def event_bounds(event: dict) -> Tuple[datetime, datetime]:
+    """Timezone aware start and end of a Calendar event, all-day events in local time."""
+    return _parse_event_time(event['start']), _parse_event_time(event['end'])
+
+
+def _parse_event_time(value: dict) -> datetime:
+    parsed = datetime.fromisoformat((value.get('dateTime') or value['date']).replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.astimezone()
+
+
+def free_slots(
+    busy: Iterable[Tuple[datetime, datetime]],
+    open_start: datetime,
+    open_end: datetime,
+    duration: timedelta,
+    step: timedelta = timedelta(minutes=SLOT_STEP_MINUTES),
+) -> List[Tuple[datetime, datetime]]:
+    """Back to back slots of ``duration`` in [open_start, open_end) clear of ``busy``.
+
+    ``busy`` must be sorted by start. One sweep keeps a cursor at the end of the
+    busy time seen so far, every gap before the next busy start is filled with slots
+    starting on ``step`` boundaries.
+    """
+    if duration <= timedelta(0) or step <= timedelta(0):
+        raise ValueError(f"Slot duration and step must be positive, got {duration} and {step}")
+
+    slots = []
+    cursor = open_start
+    for busy_start, busy_end in [*busy, (open_end, open_end)]:
+        slot_start = _round_up(cursor, step)
+        while slot_start + duration <= min(busy_start, open_end):
+            slots.append((slot_start, slot_start + duration))
+            slot_start += duration
+        cursor = max(cursor, busy_end)
+        if cursor >= open_end:
+            break
+    return slots
+
+
+def _round_up(moment: datetime, step: timedelta) -> datetime:
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight + -(-(moment - midnight) // step) * step
+
+
+def _business_hours(day: Date) -> Optional[Tuple[datetime, datetime]]:
+    if str(day.weekday()) not in BUSINESS_DAYS.split(','):
+        return None
+    opens = datetime.strptime(f"{day.isoformat()} {BUSINESS_HOURS_START}", '%Y-%m-%d %H:%M').astimezone()
+    closes = datetime.strptime(f"{day.isoformat()} {BUSINESS_HOURS_END}", '%Y-%m-%d %H:%M').astimezone()
+    return opens, closes
+
+
+def _overlaps(event: dict, start: datetime, end: datetime) -> bool:
+    event_start, event_end = event_bounds(event)
+    return event_start < end and event_end > start
+
+
+class CalendarWindow:
+    """The next CALENDAR_WINDOW_DAYS of one calendar, held in memory for a call.
+
+    Events are kept sorted by start time. An overlap query bisects to the events
+    starting before its end and scans back no further than the longest event, so
+    availability questions inside the window need no API call. Bookings made by the
+    agent are inserted in place.
+    """
+
+    def __init__(self, agent_id: str, user_id: str, *, days: int = CALENDAR_WINDOW_DAYS):
+        self.agent_id = agent_id
+        self.user_id = user_id
+        self.days = days
+
+        self._starts: List[datetime] = []
+        self._events: List[Tuple[datetime, datetime, dict]] = []
+        self._longest = timedelta(0)
+        self._window: Optional[Tuple[datetime, datetime]] = None
+        self._fetched_at = 0.0
+        self._fetch_task: Optional[asyncio.Task] = None
+        # (added at, event) of bookings a refetch in flight may not have seen
+        self._added: List[Tuple[float, dict]] = []
+
+        self.hits = 0
+        self.misses = 0
+
+    def start(self) -> None:
+        """Prefetch the window in the background."""
+        if self._fetch_task is None or self._fetch_task.done():
+            self._fetch_task = asyncio.create_task(self._fetch())
+
+    async def events_on(self, date: str) -> list:
+        """Events on a date, same day bounds as _check_calendar_availability which answers
+        dates outside the window."""
+        try:
+            day_start = datetime.strptime(parse_natural_date(date), '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        except ValueError:
+            return await _check_calendar_availability(date, agent_id=self.agent_id, user_id=self.user_id)
+        day_end = day_start + timedelta(days=1)
+
+        if await self._covers(day_start, day_end):
+            self.hits += 1
+            return self.overlapping(day_start, day_end)
+
+        self.misses += 1
+        return await _check_calendar_availability(date, agent_id=self.agent_id, user_id=self.user_id)
+
+    async def events_between(self, start: datetime, end: datetime) -> list:
+        """Events overlapping [start, end), from the window when it covers the range."""
+        if await self._covers(start, end):
+            self.hits += 1
+            return self.overlapping(start, end)
+
+        self.misses += 1
+        events = {}
+        day = start.astimezone(timezone.utc).date()
+        while day <= end.astimezone(timezone.utc).date():
+            for event in await _check_calendar_availability(
+                day.isoformat(), agent_id=self.agent_id, user_id=self.user_id
+            ):
+                events[event['id']] = event
+            day += timedelta(days=1)
+        return sorted(
+            (event for event in events.values() if _overlaps(event, start, end)),
+            key=lambda event: event_bounds(event)[0],
+        )
+
+    async def find_available_slots(
+        self, date: str, duration: int = 60, count: int = 3, days: int = 7
+    ) -> List[Tuple[datetime, datetime]]:
+        """First ``count`` free slots of ``duration`` minutes within business hours,
+        from ``date`` over the following ``days`` days, capped at SLOT_SEARCH_MAX_DAYS."""
+        if duration <= 0:
+            raise ValueError(f"Slot duration must be positive, got {duration}")
+        count = max(min(count, SLOT_SEARCH_MAX_COUNT), 1)
+        days = max(min(days, SLOT_SEARCH_MAX_DAYS), 1)
+
+        first_day = datetime.strptime(parse_natural_date(date), '%Y-%m-%d').date()
+        # nothing is offered in the past, slots today start from now
+        not_before = datetime.now().astimezone()
+        slots = []
+        for offset in range(days):
+            hours = _business_hours(first_day + timedelta(days=offset))
+            if hours is None or hours[1] <= not_before:
+                continue
+            opens, closes = max(hours[0], not_before), hours[1]
+            busy = [event_bounds(event) for event in await self.events_between(opens, closes)]
+            slots.extend(free_slots(busy, opens, closes, timedelta(minutes=duration)))
+            if len(slots) >= count:
+                break
+        return slots[:count]
+
+    def overlapping(self, start: datetime, end: datetime) -> list:
+        """Events overlapping [start, end), ordered by start time."""
+        first = bisect.bisect_left(self._starts, start - self._longest)
+        last = bisect.bisect_left(self._starts, end)
+        return [event for _, event_end, event in self._events[first:last] if event_end > start]
+
+    def add(self, event: dict) -> None:
+        """Record an event the agent just created."""
+        self._added.append((time.monotonic(), event))
+        self._insert(event)
+
+    def _insert(self, event: dict) -> None:
+        start, end = event_bounds(event)
+        i = bisect.bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._events.insert(i, (start, end, event))
+        self._longest = max(self._longest, end - start)
+
+    def stats(self) -> dict:
+        return {"events": len(self._events), "hits": self.hits, "misses": self.misses}
+
+    async def _covers(self, start: datetime, end: datetime) -> bool:
+        # only the first fetch is waited for, a refresh runs while the last window serves
+        if self._window is None and self._fetch_task is not None and not self._fetch_task.done():
+            await asyncio.shield(self._fetch_task)
+        if self._window is None:
+            return False
+
+        if time.monotonic() - self._fetched_at > CALENDAR_WINDOW_TTL:
+            self.start()
+        return self._window[0] <= start and end <= self._window[1]
+
+    async def _fetch(self) -> None:
+        try:
+            creds = await get_google_calendar_creds(self.agent_id, self.user_id)
+            if not creds:
+                return
+
+            window_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+            window_end = window_start + timedelta(days=self.days)
+            fetched_at = time.monotonic()
+            items = await get_calendar_client(creds).list_events(
+                window_start.isoformat().replace('+00:00', 'Z'),
+                window_end.isoformat().replace('+00:00', 'Z'),
+            )
+
+            events = sorted(((*event_bounds(item), item) for item in items), key=lambda e: e[0])
+            self._events = events
+            self._starts = [start for start, _, _ in events]
+            self._longest = max((end - start for start, end, _ in events), default=timedelta(0))
+            self._window = (window_start, window_end)
+            self._fetched_at = fetched_at
+
+            # bookings made while the request was in flight may be missing from it
+            fetched_ids = {item.get('id') for item in items}
+            self._added = [(added_at, event) for added_at, event in self._added if added_at >= fetched_at]
+            for _, event in self._added:
+                if event.get('id') not in fetched_ids:
+                    self._insert(event)
+            logger.info(f"Prefetched {len(events)} calendar events for agent {self.agent_id}")
+        except Exception as e:
+            logger.error(f"Error prefetching calendar: {str(e)}")
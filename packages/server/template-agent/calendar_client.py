@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import google_auth_httplib2
+import httplib2
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger("voice-assistant")
+
+# Overridable so calls can run against a local stand-in of the Calendar API
+GOOGLE_CALENDAR_API_URL = os.getenv('GOOGLE_CALENDAR_API_URL')
+CALENDAR_REQUEST_TIMEOUT = float(os.getenv('CALENDAR_REQUEST_TIMEOUT', '5.0'))
+CALENDAR_REQUEST_RETRIES = int(os.getenv('CALENDAR_REQUEST_RETRIES', '2'))
+# Requests one calendar may have in flight, a slow one can't take every worker thread
+CALENDAR_CONCURRENCY_PER_CLIENT = int(os.getenv('CALENDAR_CONCURRENCY_PER_CLIENT', '2'))
+CALENDAR_SERVICE_CACHE_SIZE = int(os.getenv('CALENDAR_SERVICE_CACHE_SIZE', '128'))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# The Google client is blocking, requests run on a bounded pool off the event loop
+_calendar_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('CALENDAR_WORKERS', '8')),
+    thread_name_prefix="calendar",
+)
+
+
+async def run_blocking(fn: Callable, *args):
+    """Run a blocking Google client call, e.g. a token refresh, on the calendar pool."""
+    return await asyncio.get_running_loop().run_in_executor(_calendar_executor, fn, *args)
+
+
+def _build_calendar_service(creds: Credentials):
+    """Build a Calendar API client, pointed at GOOGLE_CALENDAR_API_URL when set."""
+    client_options = {"api_endpoint": GOOGLE_CALENDAR_API_URL} if GOOGLE_CALENDAR_API_URL else None
+    return build('calendar', 'v3', credentials=creds, client_options=client_options, cache_discovery=False)
+
+
+class CalendarClient:
+    """Async access to one Google Calendar credential.
+
+    Requests are built and executed on the calendar pool with a timeout, transient
+    failures are retried and a request that outlives the caller's timeout is sent
+    again once. The service is built on first use, off the event loop.
+    httplib2 connections aren't thread safe, every pool thread keeps its own
+    persistent connection per client.
+    """
+
+    def __init__(self, creds: Credentials):
+        self.creds = creds
+        self._service = None
+        self._service_lock = threading.Lock()
+        self._slots = asyncio.Semaphore(CALENDAR_CONCURRENCY_PER_CLIENT)
+        self._local = threading.local()
+
+    async def list_events(self, time_min: str, time_max: str, calendar_id: str = 'primary') -> list:
+        """Single events overlapping [time_min, time_max), ordered by start time."""
+        items = []
+        page_token = None
+        while True:
+            result = await self._execute("list events", lambda service: service.events().list(
+                calendarId=calendar_id,
+                timeMin=time_min,
+                timeMax=time_max,
+                singleEvents=True,
+                orderBy='startTime',
+                pageToken=page_token,
+            ))
+            items.extend(result.get('items', []))
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return items
+
+    async def insert_event(self, event: dict, calendar_id: str = 'primary') -> dict:
+        # a client chosen id makes a retried insert that already went through a 409, not a duplicate
+        event = {**event, 'id': event.get('id') or uuid.uuid4().hex}
+        try:
+            return await self._execute(
+                "insert event", lambda service: service.events().insert(calendarId=calendar_id, body=event)
+            )
+        except HttpError as e:
+            if e.resp.status != 409:
+                raise
+            return await self._execute(
+                "get event", lambda service: service.events().get(calendarId=calendar_id, eventId=event['id'])
+            )
+
+    async def _execute(self, what: str, make_request: Callable) -> dict:
+        loop = asyncio.get_running_loop()
+        resubmitted = False
+        for attempt in range(CALENDAR_REQUEST_RETRIES + 1):
+            # a slot is held until the thread is done, not just while someone waits on it
+            await self._slots.acquire()
+            future = loop.run_in_executor(_calendar_executor, self._run_request, make_request)
+            future.add_done_callback(self._release_slot)
+            try:
+                # the socket timeout ends the thread, applied per connect and read it can add up,
+                # this only bounds how long the caller waits
+                return await asyncio.wait_for(asyncio.shield(future), timeout=CALENDAR_REQUEST_TIMEOUT * 2)
+            except Exception as e:
+                # a request stuck past the caller's timeout is abandoned and sent again once,
+                # its thread keeps its slot until the socket timeout ends it
+                timed_out = not future.done()
+                if attempt == CALENDAR_REQUEST_RETRIES or not _is_retryable(e) or (timed_out and resubmitted):
+                    raise
+                resubmitted = resubmitted or timed_out
+                logger.warning(f"Retrying calendar {what} after error: {str(e) or type(e).__name__}")
+                await asyncio.sleep(0.25 * 2 ** attempt)
+
+    def _release_slot(self, future: asyncio.Future) -> None:
+        self._slots.release()
+        if not future.cancelled():
+            future.exception()  # retrieved, a caller that gave up no longer awaits it
+
+    def _run_request(self, make_request: Callable) -> dict:
+        with self._service_lock:
+            if self._service is None:
+                self._service = _build_calendar_service(self.creds)
+        return make_request(self._service).execute(http=self._http())
+
+    def _http(self) -> google_auth_httplib2.AuthorizedHttp:
+        http: Optional[google_auth_httplib2.AuthorizedHttp] = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = google_auth_httplib2.AuthorizedHttp(
+                self.creds, http=httplib2.Http(timeout=CALENDAR_REQUEST_TIMEOUT)
+            )
+        return http
+
+
+def _naive_utc(expiry: Optional[datetime]) -> datetime:
+    """google-auth keeps expiries as naive UTC, credentials built from an ISO string may be aware."""
+    if expiry is None:
+        return datetime.min
+    if expiry.tzinfo is not None:
+        return expiry.astimezone(timezone.utc).replace(tzinfo=None)
+    return expiry
+
+
+def _is_retryable(e: Exception) -> bool:
+    if isinstance(e, HttpError):
+        return e.resp.status in RETRYABLE_STATUS
+    return isinstance(e, (asyncio.TimeoutError, httplib2.HttpLib2Error, OSError))
+
+
+# Ready clients per credential, building one parses the discovery document
+_clients: "OrderedDict[tuple, CalendarClient]" = OrderedDict()
+
+
+def get_calendar_client(creds: Credentials) -> CalendarClient:
+    """Cached client for the credential ``creds`` belongs to."""
+    key = (creds.client_id, creds.refresh_token or creds.token)
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = CalendarClient(creds)
+        if len(_clients) > CALENDAR_SERVICE_CACHE_SIZE:
+            _clients.popitem(last=False)
+        return client
+
+    _clients.move_to_end(key)
+    # the client keeps its credentials object, take over a newer access token
+    cached = client.creds
+    if creds.token != cached.token and _naive_utc(creds.expiry) >= _naive_utc(cached.expiry):
+        cached.token = creds.token
+        cached.expiry = creds.expiry
+    return client
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+
+from calendar_client import run_blocking
+
+logger = logging.getLogger("voice-assistant")
+
+SCOPES = ['https://www.googleapis.com/auth/calendar']
+# Overridable so calls can run against a local stand-in of the OAuth endpoint
+GOOGLE_OAUTH_TOKEN_URI = os.getenv('GOOGLE_OAUTH_TOKEN_URI', 'https://oauth2.googleapis.com/token')
+GRAHAM_API_URL = os.getenv('GRAHAM_API_URL')
+GRAHAM_API_KEY = os.getenv('GRAHAM_API_KEY')
+# Tokens are refreshed this many seconds before they expire
+CALENDAR_TOKEN_REFRESH_MARGIN = float(os.getenv('CALENDAR_TOKEN_REFRESH_MARGIN', '300'))
+CALENDAR_TOKEN_REFRESH_RETRY = float(os.getenv('CALENDAR_TOKEN_REFRESH_RETRY', '30'))
+# Credentials nobody asked for in this long stop being refreshed, the next use refreshes them again
+CALENDAR_CREDENTIALS_IDLE = float(os.getenv('CALENDAR_CREDENTIALS_IDLE', '3600'))
+
+
+def _load_credentials() -> Optional[Credentials]:
+    """Credentials from environment variables."""
+    if not os.getenv('GOOGLE_CALENDAR_ENABLED') == 'true':
+        logger.error("Google Calendar is not enabled for this agent")
+        return None
+
+    if not all([
+        os.getenv('GOOGLE_CALENDAR_ACCESS_TOKEN'),
+        os.getenv('GOOGLE_CALENDAR_REFRESH_TOKEN'),
+        os.getenv('GOOGLE_CALENDAR_EXPIRES_AT')
+    ]):
+        logger.error("Missing required Google Calendar environment variables")
+        return None
+
+    expiry = datetime.fromisoformat(os.getenv('GOOGLE_CALENDAR_EXPIRES_AT'))
+    if expiry.tzinfo is not None:
+        # google-auth compares expiries as naive UTC
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return Credentials(
+        token=os.getenv('GOOGLE_CALENDAR_ACCESS_TOKEN'),
+        refresh_token=os.getenv('GOOGLE_CALENDAR_REFRESH_TOKEN'),
+        token_uri=GOOGLE_OAUTH_TOKEN_URI,
+        client_id=os.getenv("GOOGLE_CLIENT_ID"),
+        client_secret=os.getenv("GOOGLE_CLIENT_SECRET"),
+        scopes=SCOPES,
+        expiry=expiry
+    )
+
+
+async def update_calendar_tokens(agent_id: str, user_id: str, access_token: str, refresh_token: str, expires_at: datetime):
+    """Update calendar tokens in the database via API."""
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+            async with session.post(
+                f"{GRAHAM_API_URL}/api/calendar/update-tokens",
+                headers={"Authorization": f"Bearer {GRAHAM_API_KEY}"},
+                json={
+                    "agentId": agent_id,
+                    "userId": user_id,
+                    "accessToken": access_token,
+                    "refreshToken": refresh_token,
+                    "expiresAt": expires_at.isoformat()
+                },
+            ) as response:
+                if not response.ok:
+                    raise Exception(f"Failed to update calendar tokens: {response.status}")
+    except Exception as e:
+        logger.error(f"Error updating calendar tokens: {e}")
+        raise
+
+
+class CalendarCredentials:
+    """Google Calendar credentials of one agent and user, kept fresh in the background.
+
+    The same Credentials object is handed out every time and refreshed in place
+    CALENDAR_TOKEN_REFRESH_MARGIN seconds before it expires, so calendar clients
+    holding it never see an expired token. Refreshed tokens are written back through
+    the Graham API. Only a token that has already expired is refreshed on the caller's
+    path.
+    """
+
+    def __init__(self, agent_id: str, user_id: str):
+        self.agent_id = agent_id
+        self.user_id = user_id
+        self._creds: Optional[Credentials] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refreshing: Optional[asyncio.Task] = None
+        self._last_used = time.monotonic()
+
+    @property
+    def idle(self) -> bool:
+        return time.monotonic() - self._last_used > CALENDAR_CREDENTIALS_IDLE
+
+    async def get(self) -> Optional[Credentials]:
+        if self._creds is None:
+            self._creds = _load_credentials()
+            if self._creds is None:
+                return None
+
+        self._last_used = time.monotonic()
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_ahead())
+
+        if self._creds.expired:
+            await self.refresh()
+        return self._creds
+
+    async def refresh(self) -> None:
+        """Refresh the token, concurrent callers share one request."""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._refresh())
+        await asyncio.shield(self._refreshing)
+
+    async def aclose(self) -> None:
+        self._stop()
+
+    def _stop(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+
+    async def _refresh_ahead(self) -> None:
+        while self._creds.refresh_token and self._creds.expiry:
+            delay = self._refresh_delay()
+            if delay > 0:
+                # a caller may refresh an expired token meanwhile, the deadline is checked again
+                await asyncio.sleep(delay)
+                continue
+            if self.idle:
+                return
+
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing calendar token for agent {self.agent_id}: {str(e)}")
+                await asyncio.sleep(CALENDAR_TOKEN_REFRESH_RETRY)
+
+    def _refresh_delay(self) -> float:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return (self._creds.expiry - now).total_seconds() - CALENDAR_TOKEN_REFRESH_MARGIN
+
+    async def _refresh(self) -> None:
+        creds = self._creds
+        # google-auth refreshes with a blocking request
+        await run_blocking(creds.refresh, Request())
+        logger.info(f"Refreshed calendar token for agent {self.agent_id}, expires at {creds.expiry}")
+
+        if not GRAHAM_API_URL:
+            return
+        try:
+            await update_calendar_tokens(self.agent_id, self.user_id, creds.token, creds.refresh_token, creds.expiry)
+        except Exception:
+            # the refreshed token is still good for this process
+            pass
+
+
+_credentials: Dict[Tuple[str, str], CalendarCredentials] = {}
+
+
+def get_calendar_credentials(agent_id: str, user_id: str) -> CalendarCredentials:
+    # managers nobody used for CALENDAR_CREDENTIALS_IDLE are dropped, their refresh has stopped
+    for idle_key in [key for key, manager in _credentials.items() if manager.idle]:
+        _credentials.pop(idle_key)._stop()
+
+    key = (agent_id, user_id)
+    if key not in _credentials:
+        _credentials[key] = CalendarCredentials(agent_id, user_id)
+    return _credentials[key]
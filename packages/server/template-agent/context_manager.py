@@ -0,0 +1,128 @@
+import asyncio
+import logging
+
+from livekit.agents import llm
+from livekit.agents.pipeline import VoicePipelineAgent
+
+logger = logging.getLogger("voice-assistant")
+
+SUMMARY_PROMPT = (
+    "Summarize the earlier part of this phone conversation for the assistant that continues it. "
+    "Keep names, phone numbers, dates, times, booked appointments and open questions. "
+    "Be brief and factual, no more than a few sentences."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough local token count, about four characters per token for English text."""
+    return len(text) // 4 + 1
+
+
+class ChatContextManager:
+    """Keeps the prompt of long calls within a token budget.
+
+    The system prompt and the last ``keep_turns`` user turns are sent verbatim. Once
+    the context grows past ``max_tokens``, older turns are folded into a summary that
+    is produced in the background, so the turn that crosses the budget is not delayed.
+    """
+
+    def __init__(self, summarizer: llm.LLM, *, max_tokens: int = 2000, keep_turns: int = 6):
+        self._summarizer = summarizer
+        self._max_tokens = max_tokens
+        self._keep_turns = keep_turns
+
+        self._summary = ""
+        # one message per summary, the LLM plugin's per-id message cache keeps its conversion
+        self._summary_msg: llm.ChatMessage | None = None
+        self._summarized_ids: set[str] = set()
+        self._summary_task: asyncio.Task | None = None
+        self._token_counts: dict[str, tuple[object, int]] = {}
+
+    def before_llm_cb(self, agent: VoicePipelineAgent, chat_ctx: llm.ChatContext) -> None:
+        """``before_llm_cb`` for ``VoicePipelineAgent``, trims the per-turn copy of the context."""
+        self.trim(chat_ctx)
+
+    def trim(self, chat_ctx: llm.ChatContext) -> None:
+        messages = chat_ctx.messages
+        prefix = 0
+        while prefix < len(messages) and messages[prefix].role == "system":
+            prefix += 1
+
+        user_indexes = [i for i in range(prefix, len(messages)) if messages[i].role == "user"]
+        if len(user_indexes) <= self._keep_turns:
+            return
+
+        cut = user_indexes[-self._keep_turns]
+        older = messages[prefix:cut]
+        pending = [msg for msg in older if msg.id not in self._summarized_ids]
+
+        if self._summary and self._summary_msg is None:
+            self._summary_msg = llm.ChatMessage.create(
+                text=f"Summary of the earlier conversation: {self._summary}", role="system"
+            )
+        summary = [self._summary_msg] if self._summary else []
+        # the budget applies to what the model is sent, turns already summarized don't count
+        sent = messages[:prefix] + summary + pending + messages[cut:]
+
+        if pending and self._count_tokens(sent) > self._max_tokens:
+            self._schedule_summary(pending)
+
+        if summary:
+            chat_ctx.messages = sent
+
+    def _count_tokens(self, messages: list[llm.ChatMessage]) -> int:
+        total = 0
+        for msg in messages:
+            content = msg.content
+            cached = self._token_counts.get(msg.id)
+            if cached is None or cached[0] is not content:
+                cached = (content, estimate_tokens(_message_text(msg)))
+                self._token_counts[msg.id] = cached
+            total += cached[1]
+        return total
+
+    def _schedule_summary(self, messages: list[llm.ChatMessage]) -> None:
+        if self._summary_task is not None and not self._summary_task.done():
+            return
+
+        self._summary_task = asyncio.create_task(self._summarize(messages))
+
+    async def _summarize(self, messages: list[llm.ChatMessage]) -> None:
+        transcript = "\n".join(
+            f"{msg.role}: {_message_text(msg)}" for msg in messages if _message_text(msg)
+        )
+        if self._summary:
+            transcript = f"Summary so far: {self._summary}\n{transcript}"
+
+        summary_ctx = llm.ChatContext().append(role="system", text=SUMMARY_PROMPT)
+        summary_ctx.append(role="user", text=transcript)
+
+        try:
+            parts = []
+            async with self._summarizer.chat(chat_ctx=summary_ctx) as stream:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+        except Exception as e:
+            logger.error(f"Error summarizing chat context: {str(e)}")
+            return
+
+        summary = "".join(parts).strip()
+        if not summary:
+            return
+
+        self._summary = summary
+        self._summary_msg = None
+        self._summarized_ids.update(msg.id for msg in messages)
+        for msg in messages:
+            self._token_counts.pop(msg.id, None)
+        logger.info(f"Summarized {len(messages)} earlier messages")
+
+
+def _message_text(msg: llm.ChatMessage) -> str:
+    content = msg.content
+    if isinstance(content, list):
+        return " ".join(c for c in content if isinstance(c, str))
+    if content is None:
+        return ""
+    return str(content)
@@ -16,15 +16,27 @@
 # limitations under the License.
 
 
+from .client import aclose_clients, get_client, prewarm_client
+from .hedge import HedgedLLM, HedgedLLMStream
 from .llm import LLM, LLMStream
 from .log import logger
+from .metrics import Histogram, LLMLatencyMetrics, LLMTimings, llm_latency
 from .models import ChatModels
 from .version import __version__
 
 __all__ = [
     "LLM",
     "LLMStream",
+    "HedgedLLM",
+    "HedgedLLMStream",
     "ChatModels",
+    "Histogram",
+    "LLMLatencyMetrics",
+    "LLMTimings",
+    "llm_latency",
+    "get_client",
+    "aclose_clients",
+    "prewarm_client",
     "logger",
     "__version__",
 ]
@@ -16,16 +16,21 @@
 
 from __future__ import annotations
 
+import asyncio
 import inspect
 import json
 import os
 import logging
+import time
+import weakref
 from dataclasses import dataclass
 from typing import (
     Any,
     Awaitable,
+    Callable,
     List,
     Literal,
+    MutableSet,
     Tuple,
     Union,
     get_args,
@@ -44,6 +49,9 @@ from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions
 
 from cerebras.cloud.sdk import AsyncCerebras
 
+from ..parallel_fncs import ParallelFunctionCalls
+from .client import get_client
+from .metrics import LLMTimings, llm_latency
 from .models import (
     ChatModels,
 )
@@ -58,6 +66,9 @@ class LLMOptions:
     temperature: float | None
     parallel_tool_calls: bool | None
     tool_choice: Union[ToolChoice, Literal["auto", "required", "none"]] | None
+    fnc_timeout: float | None
+    agent_id: str | None
+    max_tokens: int | None
 
 
 class LLM(llm.LLM):
@@ -72,12 +83,21 @@ class LLM(llm.LLM):
         temperature: float | None = None,
         parallel_tool_calls: bool | None = None,
         tool_choice: Union[ToolChoice, Literal["auto", "required", "none"]] = "auto",
+        fnc_timeout: float | None = 10.0,
+        agent_id: str | None = None,
+        max_tokens: int | None = 1024,
     ) -> None:
         """
         Create a new instance of Cerebras LLM.
 
         ``api_key`` must be set to your Cerebras API key, either using the argument or by setting
         the ``CEREBRAS_API_KEY`` environmental variable.
+
+        With ``parallel_tool_calls`` enabled, every tool call of a turn runs concurrently and
+        must finish within ``fnc_timeout`` seconds of the first one starting.
+
+        Request latencies are recorded in ``llm_latency``, per model and ``agent_id``.
+        ``max_tokens`` caps the completion length, ``None`` leaves it to the model.
         """
         super().__init__()
 
@@ -91,15 +111,15 @@ class LLM(llm.LLM):
             temperature=temperature,
             parallel_tool_calls=parallel_tool_calls,
             tool_choice=tool_choice,
+            fnc_timeout=fnc_timeout,
+            agent_id=agent_id,
+            max_tokens=max_tokens,
         )
         
-        self._client = client or AsyncCerebras(
-            api_key=api_key,
-            base_url=base_url,
-            timeout=httpx.Timeout(60.0, read=30.0, write=30.0, connect=5.0),
-            max_retries=2,
-            warm_tcp_connection=True,  # Enable TCP warming for better TTFT
-        )
+        # shared per process so every call reuses warm connections
+        self._client = client or get_client(api_key=api_key, base_url=base_url)
+        self._running_fncs: MutableSet[asyncio.Task[Any]] = set()
+        self._messages = _MessageCache()
 
     def chat(
         self,
@@ -122,10 +142,10 @@ class LLM(llm.LLM):
 
         opts: dict[str, Any] = dict()
         if fnc_ctx and len(fnc_ctx.ai_functions) > 0:
-            tools = []
-            for fnc in fnc_ctx.ai_functions.values():
-                tools.append(_build_function_description(fnc))
-            opts["tools"] = tools
+            opts["tools"] = _build_tools(fnc_ctx)
+
+            if parallel_tool_calls is not None:
+                opts["parallel_tool_calls"] = parallel_tool_calls
 
             if tool_choice is not None:
                 if isinstance(tool_choice, ToolChoice):
@@ -135,14 +155,16 @@ class LLM(llm.LLM):
                     if tool_choice == "required":
                         opts["tool_choice"] = {"type": "function"}
 
-        messages = _build_cerebras_messages(chat_ctx.messages)
+        if self._opts.max_tokens is not None:
+            opts["max_tokens"] = self._opts.max_tokens
+
+        messages = self._messages.build(chat_ctx.messages)
         
         stream = self._client.chat.completions.create(
             model=self._opts.model,
             messages=messages,
             temperature=temperature or 0.7,
             stream=True,
-            max_tokens=opts.get("max_tokens", 1024),
             **opts,
         )
 
@@ -152,6 +174,7 @@ class LLM(llm.LLM):
             chat_ctx=chat_ctx,
             fnc_ctx=fnc_ctx,
             conn_options=conn_options,
+            parallel_tool_calls=bool(parallel_tool_calls),
         )
 
 
@@ -164,6 +187,7 @@ class LLMStream(llm.LLMStream):
         chat_ctx: llm.ChatContext,
         fnc_ctx: llm.FunctionContext | None,
         conn_options: APIConnectOptions,
+        parallel_tool_calls: bool = False,
     ) -> None:
         super().__init__(
             llm, chat_ctx=chat_ctx, fnc_ctx=fnc_ctx, conn_options=conn_options
@@ -171,28 +195,66 @@ class LLMStream(llm.LLMStream):
         self._awaitable_cerebras_stream = cerebras_stream
         self._cerebras_stream = None
 
-        self._tool_call_id: str | None = None
-        self._fnc_name: str | None = None
-        self._fnc_raw_arguments: str | None = None
+        # tool calls are streamed as fragments, keyed by their index in the delta
+        self._tool_calls: dict[int, _ToolCallState] = {}
+        self._parallel_fncs: ParallelFunctionCalls | None = None
+        if parallel_tool_calls:
+            self._parallel_fncs = ParallelFunctionCalls(
+                llm._running_fncs, timeout=llm._opts.fnc_timeout
+            )
 
         self._request_id: str = ""
         self._input_tokens = 0
         self._output_tokens = 0
 
+        self._timings: LLMTimings | None = None
+
+    @property
+    def timings(self) -> LLMTimings | None:
+        """Latency timestamps of the request behind this stream."""
+        return self._timings
+
     async def _run(self) -> None:
+        timings = self._timings = LLMTimings(
+            request_id=self._request_id,
+            model=self._llm._opts.model,
+            agent_id=self._llm._opts.agent_id,
+            request_sent=time.perf_counter(),
+        )
         try:
             if not self._cerebras_stream:
                 self._cerebras_stream = await self._awaitable_cerebras_stream
+            timings.first_byte = time.perf_counter()
 
+            last_token: float | None = None
             async for chunk in self._cerebras_stream:
+                if not self._request_id and getattr(chunk, "id", None):
+                    self._request_id = timings.request_id = chunk.id
+
                 chat_chunk = self._parse_chunk(chunk)
                 if chat_chunk is not None:
+                    now = time.perf_counter()
+                    if last_token is None:
+                        timings.first_token = now
+                    else:
+                        timings.token_gaps.append(now - last_token)
+                    last_token = now
+
                     self._event_ch.send_nowait(chat_chunk)
 
-                # Update token counts from usage info if available
-                if hasattr(chunk, 'usage'):
-                    self._input_tokens = getattr(chunk.usage, 'prompt_tokens', 0)
-                    self._output_tokens = getattr(chunk.usage, 'completion_tokens', 0)
+                # Update token counts from usage info if available, usually only on the last chunk
+                usage = getattr(chunk, 'usage', None)
+                if usage is not None:
+                    self._input_tokens = usage.prompt_tokens or 0
+                    self._output_tokens = usage.completion_tokens or 0
+
+            # the stream may end without closing every call (e.g. no arguments)
+            chat_chunk = self._flush_tool_calls()
+            if chat_chunk is not None:
+                self._event_ch.send_nowait(chat_chunk)
+
+            timings.end = time.perf_counter()
+            llm_latency.record(timings)
 
             self._event_ch.send_nowait(
                 llm.ChatChunk(
@@ -216,91 +278,243 @@ class LLMStream(llm.LLMStream):
             return None
 
         choice = chunk.choices[0]
-        if choice.delta.content is not None:
-            return llm.ChatChunk(
-                request_id=self._request_id,
-                choices=[
-                    llm.Choice(
-                        delta=llm.ChoiceDelta(content=choice.delta.content, role="assistant")
+        delta = choice.delta
+        if delta is None:
+            return None
+
+        fnc_calls: list[llm.function_context.FunctionCallInfo] = []
+        for tool_call in getattr(delta, "tool_calls", None) or []:
+            fnc_info = self._accumulate_tool_call(tool_call)
+            if fnc_info is not None:
+                fnc_calls.append(fnc_info)
+
+        if choice.finish_reason in ("tool_calls", "stop"):
+            fnc_calls.extend(self._pop_pending_tool_calls())
+
+        if delta.content is None and not fnc_calls:
+            return None
+
+        return llm.ChatChunk(
+            request_id=self._request_id,
+            choices=[
+                llm.Choice(
+                    delta=llm.ChoiceDelta(
+                        role="assistant",
+                        content=delta.content,
+                        tool_calls=fnc_calls or None,
                     )
-                ],
+                )
+            ],
+        )
+
+    def _accumulate_tool_call(
+        self, tool_call: Any
+    ) -> llm.function_context.FunctionCallInfo | None:
+        """Merge a tool call delta, returns the call once its arguments are complete."""
+        function = getattr(tool_call, "function", None)
+        if function is None:
+            return None
+
+        index = tool_call.index
+        if index is None:
+            # some responses omit the index, fall back to matching on the id
+            index = next(
+                (i for i, c in self._tool_calls.items() if c.tool_call_id == tool_call.id),
+                len(self._tool_calls),
             )
-        elif hasattr(choice.delta, 'tool_calls') and choice.delta.tool_calls:
-            tool_call = choice.delta.tool_calls[0]
-            if hasattr(tool_call, 'function'):
-                try:
-                    self._tool_call_id = tool_call.id
-                    self._fnc_name = tool_call.function.name
-                    
-                    # Handle arguments that might be dict or string
-                    if isinstance(tool_call.function.arguments, dict):
-                        self._fnc_raw_arguments = json.dumps(tool_call.function.arguments)
-                    else:
-                        self._fnc_raw_arguments = tool_call.function.arguments
-
-                    if self._fnc_ctx:
-                        fnc_info = _create_ai_function_info(
-                            self._fnc_ctx,
-                            self._tool_call_id,
-                            self._fnc_name,
-                            self._fnc_raw_arguments,
-                        )
-                        self._function_calls_info.append(fnc_info)
-
-                        return llm.ChatChunk(
-                            request_id=self._request_id,
-                            choices=[
-                                llm.Choice(
-                                    delta=llm.ChoiceDelta(
-                                        role="assistant",
-                                        tool_calls=[fnc_info],
-                                    ),
-                                )
-                            ],
-                        )
-                except Exception as e:
-                    logger.error(f"Error parsing tool call: {str(e)}")
-                    raise
+
+        state = self._tool_calls.get(index)
+        if state is None:
+            state = self._tool_calls[index] = _ToolCallState()
+
+        if tool_call.id:
+            state.tool_call_id = tool_call.id
+        if function.name:
+            state.fnc_name = function.name
+
+        arguments = function.arguments
+        if isinstance(arguments, dict):
+            # already parsed by the API, the call is complete
+            state.parsed_arguments = arguments
+            state.raw_arguments = json.dumps(arguments)
+            state.closed = True
+        elif arguments:
+            state.feed(arguments)
+
+        if state.closed and not state.dispatched:
+            return self._dispatch_tool_call(state)
 
         return None
 
+    def _pop_pending_tool_calls(self) -> list[llm.function_context.FunctionCallInfo]:
+        fnc_calls = []
+        for state in self._tool_calls.values():
+            if not state.dispatched and state.fnc_name:
+                fnc_info = self._dispatch_tool_call(state)
+                if fnc_info is not None:
+                    fnc_calls.append(fnc_info)
 
-def _build_cerebras_messages(messages: List[llm.ChatMessage]) -> List[dict]:
-    """Build messages in Cerebras API format."""
-    result = []
-    
-    # Always ensure first message is system
-    if not messages or messages[0].role != "system":
-        result.append({
-            "role": "system",
-            "content": "You are a helpful assistant."
-        })
+        return fnc_calls
+
+    def _flush_tool_calls(self) -> llm.ChatChunk | None:
+        fnc_calls = self._pop_pending_tool_calls()
+        if not fnc_calls:
+            return None
 
-    for msg in messages:
-        content = msg.content
-        if isinstance(content, list):
-            content = " ".join([c for c in content if isinstance(c, str)])
-        elif content is None:
-            content = ""
+        return llm.ChatChunk(
+            request_id=self._request_id,
+            choices=[
+                llm.Choice(
+                    delta=llm.ChoiceDelta(role="assistant", tool_calls=fnc_calls)
+                )
+            ],
+        )
 
-        if msg.role == "system":
+    def _dispatch_tool_call(
+        self, state: _ToolCallState
+    ) -> llm.function_context.FunctionCallInfo | None:
+        state.dispatched = True
+        if not self._fnc_ctx:
+            logger.warning("cerebras stream tried to run function without function context")
+            return None
+
+        if state.fnc_name is None:
+            logger.warning("cerebras stream tried to call a function but fnc_name is not set")
+            return None
+
+        try:
+            fnc_info = _create_ai_function_info(
+                self._fnc_ctx,
+                state.tool_call_id or f"call_{len(self._function_calls_info)}",
+                state.fnc_name,
+                state.raw_arguments,
+                state.parsed_arguments,
+            )
+        except Exception as e:
+            logger.error(f"Error parsing tool call: {str(e)}")
+            raise
+
+        if self._parallel_fncs is not None:
+            fnc_info = self._parallel_fncs.add(fnc_info)
+
+        self._function_calls_info.append(fnc_info)
+        return fnc_info
+
+
+@dataclass
+class _ToolCallState:
+    """Arguments of a single streamed tool call, assembled across chunks."""
+
+    tool_call_id: str | None = None
+    fnc_name: str | None = None
+    raw_arguments: str = ""
+    parsed_arguments: dict[str, Any] | None = None
+    closed: bool = False
+    dispatched: bool = False
+    _depth: int = 0
+    _in_string: bool = False
+    _escaped: bool = False
+
+    def feed(self, fragment: str) -> None:
+        """Append an argument fragment and track whether the JSON object has closed."""
+        self.raw_arguments += fragment
+        if self.closed:
+            return
+
+        for ch in fragment:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.closed = True
+                    return
+
+
+class _MessageCache:
+    """Converts chat messages to the Cerebras format, reusing conversions across turns.
+
+    The pipeline copies the chat context before every turn, so messages are keyed by
+    their stable ``id`` and only re-converted when their content changed.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[tuple, List[dict]]] = {}
+
+    def build(self, messages: List[llm.ChatMessage]) -> List[dict]:
+        result = []
+
+        # Always ensure first message is system
+        if not messages or messages[0].role != "system":
             result.append({
                 "role": "system",
-                "content": content
-            })
-        elif msg.role == "user":
-            result.append({
-                "role": "user",
-                "content": content
+                "content": "You are a helpful assistant."
             })
-        elif msg.role == "assistant":
-            if msg.tool_calls:
-                # For tool calls, split into two messages
-                result.append({
+
+        for msg in messages:
+            key = _message_key(msg)
+            entry = self._entries.get(msg.id)
+            if entry is None or entry[0] != key:
+                entry = (key, _build_cerebras_message(msg))
+                self._entries[msg.id] = entry
+            result.extend(entry[1])
+
+        # forget messages that were dropped from the context
+        if len(self._entries) > len(messages):
+            ids = {msg.id for msg in messages}
+            self._entries = {k: v for k, v in self._entries.items() if k in ids}
+
+        return result
+
+
+def _message_key(msg: llm.ChatMessage) -> tuple:
+    content = msg.content
+    if isinstance(content, list):
+        content = tuple(c for c in content if isinstance(c, str))
+
+    tool_call_ids = None
+    if msg.tool_calls:
+        tool_call_ids = tuple(tc.tool_call_id for tc in msg.tool_calls)
+
+    return (msg.role, content, msg.tool_call_id, tool_call_ids)
+
+
+def _build_cerebras_message(msg: llm.ChatMessage) -> List[dict]:
+    """Convert a single chat message, tool calls expand to two messages."""
+    content = msg.content
+    if isinstance(content, list):
+        content = " ".join([c for c in content if isinstance(c, str)])
+    elif content is None:
+        content = ""
+
+    if msg.role == "system":
+        return [{
+            "role": "system",
+            "content": content
+        }]
+    elif msg.role == "user":
+        return [{
+            "role": "user",
+            "content": content
+        }]
+    elif msg.role == "assistant":
+        if msg.tool_calls:
+            # For tool calls, split into two messages
+            return [
+                {
                     "role": "assistant",
                     "content": content or ""
-                })
-                result.append({
+                },
+                {
                     "role": "system",  # Convert tool call to system message
                     "content": json.dumps({
                         "tool_calls": [{
@@ -312,25 +526,58 @@ def _build_cerebras_messages(messages: List[llm.ChatMessage]) -> List[dict]:
                             }
                         } for tc in msg.tool_calls]
                     })
-                })
-            else:
-                result.append({
-                    "role": "assistant",
-                    "content": content
-                })
-        elif msg.role == "tool":
-            # Convert tool responses to system messages
-            result.append({
-                "role": "system",
-                "content": json.dumps({
-                    "tool_response": {
-                        "content": msg.content or "",
-                        "tool_call_id": msg.tool_call_id
-                    }
-                })
+                },
+            ]
+        return [{
+            "role": "assistant",
+            "content": content
+        }]
+    elif msg.role == "tool":
+        # Convert tool responses to system messages
+        return [{
+            "role": "system",
+            "content": json.dumps({
+                "tool_response": {
+                    "content": msg.content or "",
+                    "tool_call_id": msg.tool_call_id
+                }
             })
-    
-    return result
+        }]
+
+    return []
+
+
+class _CompiledFunctions:
+    """Tools payload and argument validators of a function context, compiled once."""
+
+    def __init__(self, fnc_ctx: llm.FunctionContext, key: tuple[int, ...]) -> None:
+        self.key = key
+        self.tools = [
+            _build_function_description(fnc) for fnc in fnc_ctx.ai_functions.values()
+        ]
+        self.validators = {
+            name: _compile_validators(fnc) for name, fnc in fnc_ctx.ai_functions.items()
+        }
+
+
+# compiled functions per function context, rebuilt when functions are added
+_compiled_cache: weakref.WeakKeyDictionary[
+    llm.FunctionContext, _CompiledFunctions
+] = weakref.WeakKeyDictionary()
+
+
+def _compile_functions(fnc_ctx: llm.FunctionContext) -> _CompiledFunctions:
+    key = tuple(id(fnc) for fnc in fnc_ctx.ai_functions.values())
+    compiled = _compiled_cache.get(fnc_ctx)
+    if compiled is None or compiled.key != key:
+        compiled = _compiled_cache[fnc_ctx] = _CompiledFunctions(fnc_ctx, key)
+
+    return compiled
+
+
+def _build_tools(fnc_ctx: llm.FunctionContext) -> List[dict]:
+    """Return the tools payload for ``fnc_ctx``, compiling it once per set of functions."""
+    return _compile_functions(fnc_ctx).tools
 
 
 def _build_function_description(
@@ -390,68 +637,101 @@ def _create_ai_function_info(
     tool_call_id: str,
     fnc_name: str,
     raw_arguments: str,  # JSON string
+    parsed_arguments: dict[str, Any] | None = None,
 ) -> llm.function_context.FunctionCallInfo:
     if fnc_name not in fnc_ctx.ai_functions:
         raise ValueError(f"AI function {fnc_name} not found")
 
-    parsed_arguments: dict[str, Any] = {}
-    try:
-        if raw_arguments:  # ignore empty string
-            parsed_arguments = json.loads(raw_arguments)
-    except json.JSONDecodeError:
-        raise ValueError(
-            f"AI function {fnc_name} received invalid JSON arguments - {raw_arguments}"
-        )
-
-    fnc_info = fnc_ctx.ai_functions[fnc_name]
+    if parsed_arguments is None:
+        parsed_arguments = {}
+        try:
+            if raw_arguments:  # ignore empty string
+                parsed_arguments = json.loads(raw_arguments)
+        except json.JSONDecodeError:
+            raise ValueError(
+                f"AI function {fnc_name} received invalid JSON arguments - {raw_arguments}"
+            )
 
     # Ensure all necessary arguments are present and of the correct type.
     sanitized_arguments: dict[str, Any] = {}
-    for arg_info in fnc_info.arguments.values():
-        if arg_info.name not in parsed_arguments:
-            if arg_info.default is inspect.Parameter.empty:
+    for validator in _compile_functions(fnc_ctx).validators[fnc_name]:
+        if validator.name not in parsed_arguments:
+            if validator.required:
                 raise ValueError(
-                    f"AI function {fnc_name} missing required argument {arg_info.name}"
+                    f"AI function {fnc_name} missing required argument {validator.name}"
                 )
             continue
 
-        arg_value = parsed_arguments[arg_info.name]
-        if get_origin(arg_info.type) is not None:
-            if not isinstance(arg_value, list):
-                raise ValueError(
-                    f"AI function {fnc_name} argument {arg_info.name} should be a list"
-                )
-
-            inner_type = get_args(arg_info.type)[0]
-            sanitized_value = [
-                _sanitize_primitive(
-                    value=v, expected_type=inner_type, choices=arg_info.choices
-                )
-                for v in arg_value
-            ]
-        else:
-            sanitized_value = _sanitize_primitive(
-                value=arg_value, expected_type=arg_info.type, choices=arg_info.choices
-            )
-
-        sanitized_arguments[arg_info.name] = sanitized_value
+        sanitized_arguments[validator.name] = validator.convert(
+            parsed_arguments[validator.name]
+        )
 
     return llm.function_context.FunctionCallInfo(
         tool_call_id=tool_call_id,
         raw_arguments=raw_arguments,
-        function_info=fnc_info,
+        function_info=fnc_ctx.ai_functions[fnc_name],
         arguments=sanitized_arguments,
     )
 
 
-def _sanitize_primitive(*, value: Any, expected_type: type, choices: Tuple[Any] | None) -> Any:
-    """Sanitize a primitive value to the expected type."""
-    try:
-        if expected_type is str:
+@dataclass(frozen=True)
+class _ArgValidator:
+    name: str
+    required: bool
+    convert: Callable[[Any], Any]
+
+
+def _compile_validators(
+    fnc_info: llm.function_context.FunctionInfo,
+) -> List[_ArgValidator]:
+    """Resolve the argument types of a function once, into per-argument converters."""
+    validators = []
+    for arg_info in fnc_info.arguments.values():
+        if get_origin(arg_info.type) is not None:
+            inner_type = get_args(arg_info.type)[0]
+            convert = _compile_list(
+                fnc_info.name,
+                arg_info.name,
+                _compile_primitive(expected_type=inner_type, choices=arg_info.choices),
+            )
+        else:
+            convert = _compile_primitive(
+                expected_type=arg_info.type, choices=arg_info.choices
+            )
+
+        validators.append(
+            _ArgValidator(
+                name=arg_info.name,
+                required=arg_info.default is inspect.Parameter.empty,
+                convert=convert,
+            )
+        )
+
+    return validators
+
+
+def _compile_list(
+    fnc_name: str, arg_name: str, convert: Callable[[Any], Any]
+) -> Callable[[Any], Any]:
+    def _convert_list(value: Any) -> list:
+        if not isinstance(value, list):
+            raise ValueError(f"AI function {fnc_name} argument {arg_name} should be a list")
+        return [convert(v) for v in value]
+
+    return _convert_list
+
+
+def _compile_primitive(
+    *, expected_type: type, choices: Tuple[Any] | None
+) -> Callable[[Any], Any]:
+    """Build a converter sanitizing a primitive value to the expected type."""
+    if expected_type is str:
+        def _convert(value: Any) -> Any:
             if isinstance(value, dict):
                 return json.dumps(value)
             return str(value)
-        elif expected_type in (int, float):
+    elif expected_type in (int, float):
+        def _convert(value: Any) -> Any:
             if not isinstance(value, (int, float, str)):
                 raise ValueError(f"expected number, got {type(value)}")
 
@@ -462,15 +742,22 @@ def _sanitize_primitive(*, value: Any, expected_type: type, choices: Tuple[Any]
                     raise ValueError("expected int, got float")
                 return int(value)
             return float(value)
-        elif expected_type is bool:
+    elif expected_type is bool:
+        def _convert(value: Any) -> Any:
             if isinstance(value, str):
                 return value.lower() in ('true', '1', 'yes')
             return bool(value)
+    else:
+        def _convert(value: Any) -> Any:
+            if choices and value not in choices:
+                raise ValueError(f"invalid value {value}, not in {choices}")
+            return value
 
-        if choices and value not in choices:
-            raise ValueError(f"invalid value {value}, not in {choices}")
+    def _sanitize(value: Any) -> Any:
+        try:
+            return _convert(value)
+        except Exception as e:
+            logger.error(f"Error sanitizing value {value} to type {expected_type}: {str(e)}")
+            raise ValueError(f"Failed to convert {value} to {expected_type}")
 
-        return value
-    except Exception as e:
-        logger.error(f"Error sanitizing value {value} to type {expected_type}: {str(e)}")
-        raise ValueError(f"Failed to convert {value} to {expected_type}")
\ No newline at end of file
+    return _sanitize
@@ -0,0 +1,142 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+import openai
+
+from local_embeddings import get_local_model, is_local_model
+
+# Requests arriving within this window share one embeddings call
+EMBEDDING_BATCH_WINDOW = float(os.getenv('EMBEDDING_BATCH_WINDOW_MS', '5')) / 1000
+EMBEDDING_BATCH_MAX_INPUTS = int(os.getenv('EMBEDDING_BATCH_MAX_INPUTS', '64'))
+
+_client: openai.AsyncOpenAI | None = None
+# Local models run on the CPU, one inference at a time keeps them from contending for cores
+_local_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-embeddings")
+
+
+def _get_client() -> openai.AsyncOpenAI:
+    # reads OPENAI_API_KEY and OPENAI_BASE_URL, so the endpoint can be swapped for a local one
+    global _client
+    if _client is None:
+        _client = openai.AsyncOpenAI()
+    return _client
+
+
+async def _request_embeddings(input: list[str], *, model: str, dimensions: int | None) -> list[list[float]]:
+    if is_local_model(model):
+        # local models always return their native dimensions
+        return await asyncio.get_running_loop().run_in_executor(
+            _local_executor, lambda: get_local_model(model).embed(input)
+        )
+
+    kwargs = {"dimensions": dimensions} if dimensions else {}
+    response = await _get_client().embeddings.create(input=input, model=model, **kwargs)
+    return [data.embedding for data in sorted(response.data, key=lambda d: d.index)]
+
+
+class EmbeddingBatcher:
+    """Gathers embedding requests made within a few milliseconds into one API call.
+
+    Every call handled by the process shares the batcher, so concurrent RAG lookups
+    cost one request instead of one each. Identical texts in a batch are embedded once.
+    """
+
+    def __init__(self, model: str, dimensions: int | None, *, window: float = EMBEDDING_BATCH_WINDOW, max_inputs: int = EMBEDDING_BATCH_MAX_INPUTS):
+        self.model = model
+        self.dimensions = dimensions
+        self.window = window
+        self.max_inputs = max_inputs
+
+        self._waiting: List[Tuple[List[str], asyncio.Future]] = []
+        self._waiting_inputs = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # the loop only keeps weak references to tasks, in-flight requests are held here
+        self._sending: Set[asyncio.Task] = set()
+
+        self.requests = 0
+        self.inputs = 0
+
+    async def embed(self, input: list[str]) -> list[list[float]]:
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append((input, future))
+        self._waiting_inputs += len(input)
+
+        if self._waiting_inputs >= self.max_inputs:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "inputs": self.inputs,
+            "inputs_per_request": self.inputs / self.requests if self.requests else 0.0,
+        }
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        waiting, self._waiting, self._waiting_inputs = self._waiting, [], 0
+        if waiting:
+            task = asyncio.create_task(self._send(waiting))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, waiting: List[Tuple[List[str], asyncio.Future]]) -> None:
+        texts = list(dict.fromkeys(text for input, _ in waiting for text in input))
+        self.requests += 1
+        self.inputs += len(texts)
+
+        try:
+            vectors = dict(zip(texts, await _request_embeddings(texts, model=self.model, dimensions=self.dimensions)))
+        except Exception as e:
+            for _, future in waiting:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for input, future in waiting:
+            if not future.done():
+                future.set_result([vectors[text] for text in input])
+
+
+_batchers: Dict[Tuple[str, Optional[int]], EmbeddingBatcher] = {}
+
+
+def get_embedding_batcher(model: str, dimensions: int | None) -> EmbeddingBatcher:
+    batcher = _batchers.get((model, dimensions))
+    if batcher is None:
+        batcher = _batchers[(model, dimensions)] = EmbeddingBatcher(model, dimensions)
+    return batcher
+
+
+async def create_embeddings(
+    input: list[str],
+    *,
+    model: str = "text-embedding-3-small",
+    dimensions: int | None = None,
+) -> list[list[float]]:
+    """Embed ``input`` with the OpenAI embeddings API, one vector per text.
+
+    ``local/<name>`` models are run on the CPU instead, see local_embeddings. Requests
+    are micro-batched with the other calls of this process, see EmbeddingBatcher.
+    """
+    return await get_embedding_batcher(model, dimensions).embed(input)
+
+
+async def load_embedding_model(model: str) -> None:
+    """Load a ``local/`` model off the event loop, embedding_dimensions would load it inline."""
+    if is_local_model(model):
+        await asyncio.get_running_loop().run_in_executor(_local_executor, get_local_model, model)
+
+
+def embedding_dimensions(model: str) -> int:
+    """Vector size ``model`` produces, the namespace it queries must match it."""
+    if is_local_model(model):
+        return get_local_model(model).dimensions
+    return 1536
@@ -0,0 +1,5 @@
+"""Metadata conventions shared by the ingestion CLI and the agent's retrieval path."""
+
+# Chunks written by ingest.py are kept current by re-ingestion (deletes and --prune), so the
+# agent exempts them from the recency window it applies to other vectors
+INGEST_SOURCE = "ingest"
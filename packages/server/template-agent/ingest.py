@@ -0,0 +1,365 @@
+"""Bulk ingestion of business documents into the index a PineconeRagAgent queries.
+
+    python template-agent/ingest.py --index <documentNamespace> docs/ faq.jsonl
+    python template-agent/ingest.py --index <documentNamespace> --incremental --prune docs/
+
+Directories are walked for .txt, .md and .jsonl files. JSON lines carry ``id``,
+``text`` and optional ``metadata``, other files become one document named after
+their path. Documents stream through chunking, batched embedding and Pinecone
+upserts. Every stage is connected by a bounded queue, so memory stays flat
+however large the catalog is. Re-runs with --incremental only embed the chunks
+whose content changed.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from pinecone import Pinecone
+
+from embeddings import create_embeddings, embedding_dimensions
+from index_schema import INGEST_SOURCE
+
+logger = logging.getLogger("voice-assistant")
+
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
+CHUNK_MAX_CHARS = 1000
+CHUNK_OVERLAP_CHARS = 150
+DOCUMENT_EXTENSIONS = (".txt", ".md", ".jsonl")
+RETRY_ATTEMPTS = 3
+DELETE_BATCH_SIZE = 1000
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+@dataclass
+class Document:
+    id: str
+    text: str
+    metadata: dict = field(default_factory=dict)
+
+
+@dataclass
+class Chunk:
+    id: str
+    text: str
+    metadata: dict
+
+
+@dataclass
+class IngestStats:
+    documents: int = 0
+    chunks: int = 0
+    upserted: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def summary(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        return {
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "upserted": self.upserted,
+            "unchanged": self.unchanged,
+            "deleted": self.deleted,
+            "seconds": round(elapsed, 1),
+            "chunks_per_second": round(self.upserted / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+def chunk_text(text: str, *, max_chars: int = CHUNK_MAX_CHARS, overlap: int = CHUNK_OVERLAP_CHARS) -> List[str]:
+    """Pack sentences and paragraphs into chunks of at most ``max_chars``.
+
+    Consecutive chunks share up to ``overlap`` characters of trailing sentences so an
+    answer split across a boundary is still retrievable from either side.
+    """
+    units = []
+    for unit in _SENTENCE_BOUNDARY.split(text):
+        unit = " ".join(unit.split())
+        # a single unit longer than a chunk is cut at whitespace
+        while len(unit) > max_chars:
+            cut = unit.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            units.append(unit[:cut])
+            unit = unit[cut:].lstrip()
+        if unit:
+            units.append(unit)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for unit in units:
+        if current and size + len(unit) + 1 > max_chars:
+            chunks.append(" ".join(current))
+            carried: List[str] = []
+            for previous in reversed(current):
+                if sum(len(u) + 1 for u in carried) + len(previous) > overlap:
+                    break
+                carried.insert(0, previous)
+            current, size = carried, sum(len(u) + 1 for u in carried)
+        current.append(unit)
+        size += len(unit) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def load_documents(paths: Iterable[str]) -> Iterator[Document]:
+    """Lazily read documents from files and directories."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.endswith(DOCUMENT_EXTENSIONS):
+                        yield from _read_file(os.path.join(root, name), base=path)
+        else:
+            yield from _read_file(path, base=os.path.dirname(path))
+
+
+def _read_file(path: str, *, base: str) -> Iterator[Document]:
+    if path.endswith(".jsonl"):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield Document(str(record["id"]), record["text"], record.get("metadata", {}))
+    else:
+        with open(path) as f:
+            yield Document(os.path.relpath(path, base), f.read())
+
+
+class IngestionPipeline:
+    """Chunks, embeds and upserts documents with bounded concurrency.
+
+    Chunk ids are ``<document id>#<content hash>``. The chunks already stored for a
+    document are listed first and the ones it no longer has are deleted. With
+    ``incremental`` only new or changed chunks are embedded and upserted, so
+    re-indexing costs the size of the diff. ``embed_concurrency`` embedding requests and
+    ``upsert_concurrency`` Pinecone requests run at once, producers block when the
+    queue in front of a slower stage is full.
+    """
+
+    def __init__(
+        self,
+        index,
+        *,
+        namespace: str = "",
+        model: str = EMBEDDING_MODEL,
+        batch_size: int = 64,
+        upsert_batch_size: int = 20,
+        embed_concurrency: int = 4,
+        upsert_concurrency: int = 4,
+        incremental: bool = False,
+    ):
+        self.index = index
+        self.namespace = namespace
+        self.model = model
+        self.dimensions = embedding_dimensions(model)
+        self.batch_size = batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.embed_concurrency = embed_concurrency
+        self.upsert_concurrency = upsert_concurrency
+        self.incremental = incremental
+        self.stats = IngestStats()
+        self.document_ids: Set[str] = set()
+
+        self._executor = ThreadPoolExecutor(max_workers=upsert_concurrency, thread_name_prefix="pinecone-upsert")
+        self._pinecone_slots = asyncio.Semaphore(upsert_concurrency)
+
+    async def run(self, documents: Iterable[Document]) -> IngestStats:
+        self.stats = IngestStats()
+        self.document_ids = set()
+        timestamp = time.time()
+
+        document_queue: asyncio.Queue[Optional[Document]] = asyncio.Queue(maxsize=self.upsert_concurrency * 2)
+        embed_queue: asyncio.Queue[Optional[List[Chunk]]] = asyncio.Queue(maxsize=self.embed_concurrency * 2)
+        upsert_queue: asyncio.Queue[Optional[List[dict]]] = asyncio.Queue(maxsize=self.upsert_concurrency * 2)
+        pending: List[Chunk] = []
+
+        async def _document_worker():
+            nonlocal pending
+            while (document := await document_queue.get()) is not None:
+                for chunk in await self._diff(document, timestamp):
+                    pending.append(chunk)
+                    if len(pending) >= self.batch_size:
+                        batch, pending = pending, []
+                        await embed_queue.put(batch)
+
+        async def _embed_worker():
+            while (batch := await embed_queue.get()) is not None:
+                vectors = await self._retry(
+                    "embedding", create_embeddings, [chunk.text for chunk in batch], model=self.model, dimensions=self.dimensions
+                )
+                records = [
+                    {"id": chunk.id, "values": vector, "metadata": chunk.metadata}
+                    for chunk, vector in zip(batch, vectors)
+                ]
+                # Pinecone caps request bodies at 2 MB, a 1536 dimension vector is ~30 KB as JSON
+                for i in range(0, len(records), self.upsert_batch_size):
+                    await upsert_queue.put(records[i:i + self.upsert_batch_size])
+
+        async def _upsert_worker():
+            while (vectors := await upsert_queue.get()) is not None:
+                await self._pinecone("upsert", self.index.upsert, vectors=vectors, namespace=self.namespace)
+                self.stats.upserted += len(vectors)
+
+        async def _close(queue: asyncio.Queue, workers: list) -> None:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+        async with asyncio.TaskGroup() as tg:
+            upserters = [tg.create_task(_upsert_worker()) for _ in range(self.upsert_concurrency)]
+            embedders = [tg.create_task(_embed_worker()) for _ in range(self.embed_concurrency)]
+            readers = [tg.create_task(_document_worker()) for _ in range(self.upsert_concurrency)]
+
+            for document in documents:
+                self.stats.documents += 1
+                self.document_ids.add(document.id)
+                await document_queue.put(document)
+
+            await _close(document_queue, readers)
+            if pending:
+                await embed_queue.put(pending)
+            await _close(embed_queue, embedders)
+            await _close(upsert_queue, upserters)
+
+        return self.stats
+
+    async def prune(self) -> int:
+        """Delete the chunks of documents the last ``run`` didn't see.
+
+        Only meaningful when that run was given the whole knowledge base.
+        """
+        stale: List[str] = []
+        deleted = 0
+        pagination_token = None
+        while True:
+            page = await self._pinecone(
+                "list", self.index.list_paginated,
+                namespace=self.namespace, limit=100, pagination_token=pagination_token,
+            )
+            stale.extend(
+                item.id for item in page.vectors
+                if item.id.rpartition("#")[0] not in self.document_ids
+            )
+            pagination_token = page.pagination.next if page.pagination else None
+            if not pagination_token:
+                break
+
+        for i in range(0, len(stale), DELETE_BATCH_SIZE):
+            await self._pinecone("delete", self.index.delete, ids=stale[i:i + DELETE_BATCH_SIZE], namespace=self.namespace)
+            deleted += len(stale[i:i + DELETE_BATCH_SIZE])
+        self.stats.deleted += deleted
+        return deleted
+
+    async def _diff(self, document: Document, timestamp: float) -> List[Chunk]:
+        """Chunks of ``document`` that need embedding, deleting the ones it no longer has."""
+        chunks: Dict[str, Chunk] = {}
+        for i, text in enumerate(chunk_text(document.text)):
+            content_hash = hashlib.sha256(text.encode()).hexdigest()
+            chunk_id = f"{document.id}#{content_hash[:16]}"
+            chunks.setdefault(chunk_id, Chunk(
+                id=chunk_id,
+                text=text,
+                metadata={
+                    **document.metadata,
+                    "text": text,
+                    "document_id": document.id,
+                    "chunk_index": i,
+                    "content_hash": content_hash,
+                    "source": INGEST_SOURCE,
+                    "timestamp": timestamp,
+                },
+            ))
+        self.stats.chunks += len(chunks)
+
+        # ids are content hashes, an edited document's old chunks would otherwise stay live
+        existing = await self._document_chunk_ids(document.id)
+        removed = [chunk_id for chunk_id in existing if chunk_id not in chunks]
+        unchanged = [chunk_id for chunk_id in existing if chunk_id in chunks]
+
+        for i in range(0, len(removed), DELETE_BATCH_SIZE):
+            await self._pinecone("delete", self.index.delete, ids=removed[i:i + DELETE_BATCH_SIZE], namespace=self.namespace)
+        self.stats.deleted += len(removed)
+
+        if not self.incremental:
+            return list(chunks.values())
+        self.stats.unchanged += len(unchanged)
+        return [chunk for chunk_id, chunk in chunks.items() if chunk_id not in existing]
+
+    async def _document_chunk_ids(self, document_id: str) -> Set[str]:
+        ids: Set[str] = set()
+        pagination_token = None
+        while True:
+            page = await self._pinecone(
+                "list", self.index.list_paginated,
+                prefix=f"{document_id}#", namespace=self.namespace, limit=100, pagination_token=pagination_token,
+            )
+            # a longer document id can share the prefix when it contains '#'
+            ids.update(item.id for item in page.vectors if item.id.rpartition("#")[0] == document_id)
+            pagination_token = page.pagination.next if page.pagination else None
+            if not pagination_token:
+                return ids
+
+    async def _pinecone(self, what: str, fn, **kwargs):
+        """Run a blocking Pinecone call on the pool, at most ``upsert_concurrency`` at once."""
+        loop = asyncio.get_running_loop()
+        async with self._pinecone_slots:
+            return await self._retry(what, loop.run_in_executor, self._executor, lambda: fn(**kwargs))
+
+    async def _retry(self, what: str, fn, *args, **kwargs):
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == RETRY_ATTEMPTS - 1:
+                    raise
+                logger.warning(f"Retrying {what} after error: {str(e)}")
+                await asyncio.sleep(2 ** attempt)
+
+
+async def main(args: argparse.Namespace) -> None:
+    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+    index = pc.Index(args.index, host=os.getenv("PINECONE_INDEX_HOST", ""))
+    pipeline = IngestionPipeline(
+        index,
+        namespace=args.namespace,
+        model=args.model,
+        batch_size=args.batch_size,
+        upsert_batch_size=args.upsert_batch_size,
+        embed_concurrency=args.embed_concurrency,
+        upsert_concurrency=args.upsert_concurrency,
+        incremental=args.incremental,
+    )
+    stats = await pipeline.run(load_documents(args.paths))
+    if args.prune:
+        await pipeline.prune()
+    logger.info(f"Ingested into {args.index}: {stats.summary()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="files or directories of documents")
+    parser.add_argument("--index", required=True, help="the agent's documentNamespace")
+    parser.add_argument("--namespace", default="", help="Pinecone namespace, the agent queries the default one")
+    parser.add_argument("--model", default=EMBEDDING_MODEL, help="must match the agent's embedding model")
+    parser.add_argument("--batch-size", type=int, default=64, help="chunks per embedding request")
+    parser.add_argument("--upsert-batch-size", type=int, default=20, help="vectors per upsert request")
+    parser.add_argument("--embed-concurrency", type=int, default=4)
+    parser.add_argument("--upsert-concurrency", type=int, default=4)
+    parser.add_argument("--incremental", action="store_true", help="only embed new or changed chunks, delete removed ones")
+    parser.add_argument("--prune", action="store_true", help="delete documents missing from the input, which must be complete")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args))
@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+from typing import Dict, List
+
+import numpy as np
+
+logger = logging.getLogger("voice-assistant")
+
+# Model names starting with this prefix are run on the CPU from LOCAL_EMBEDDING_MODELS_DIR
+LOCAL_MODEL_PREFIX = "local/"
+LOCAL_EMBEDDING_MODELS_DIR = os.getenv('LOCAL_EMBEDDING_MODELS_DIR', '/models')
+LOCAL_EMBEDDING_THREADS = int(os.getenv('LOCAL_EMBEDDING_THREADS', '1'))
+LOCAL_EMBEDDING_MAX_LENGTH = 256
+
+
+def is_local_model(model: str) -> bool:
+    return model.startswith(LOCAL_MODEL_PREFIX)
+
+
+class LocalEmbeddingModel:
+    """ONNX sentence embedding model, e.g. an exported all-MiniLM-L6-v2 or bge-small.
+
+    The model directory holds ``model.onnx`` and ``tokenizer.json``, plus the
+    ``1_Pooling/config.json`` of a sentence-transformers export to pick CLS or mean
+    pooling. Embeddings are L2 normalized. ``embed`` blocks, run it off the event loop.
+    """
+
+    def __init__(self, path: str):
+        # onnxruntime and tokenizers are only needed when a local model is selected
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = LOCAL_EMBEDDING_THREADS
+        options.inter_op_num_threads = 1
+        self._session = onnxruntime.InferenceSession(
+            os.path.join(path, "model.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+
+        self._tokenizer = Tokenizer.from_file(os.path.join(path, "tokenizer.json"))
+        self._tokenizer.enable_truncation(LOCAL_EMBEDDING_MAX_LENGTH)
+        self._tokenizer.enable_padding()
+
+        self.pooling = "mean"
+        pooling_config = os.path.join(path, "1_Pooling", "config.json")
+        if os.path.exists(pooling_config):
+            with open(pooling_config) as f:
+                if json.load(f).get("pooling_mode_cls_token"):
+                    self.pooling = "cls"
+
+        self.dimensions = self._session.get_outputs()[0].shape[-1]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self._session.run(None, inputs)[0]
+
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = attention_mask[..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
+
+
+_models: Dict[str, LocalEmbeddingModel] = {}
+
+
+def get_local_model(model: str) -> LocalEmbeddingModel:
+    """Load ``local/<name>`` from LOCAL_EMBEDDING_MODELS_DIR once per process."""
+    local_model = _models.get(model)
+    if local_model is None:
+        name = model[len(LOCAL_MODEL_PREFIX):]
+        local_model = _models[model] = LocalEmbeddingModel(os.path.join(LOCAL_EMBEDDING_MODELS_DIR, name))
+        logger.info(f"Loaded local embedding model {name} ({local_model.dimensions} dimensions, {local_model.pooling} pooling)")
+    return local_model
@@ -0,0 +1,268 @@
+import asyncio
+import fcntl
+import glob
+import json
+import logging
+import mmap
+import os
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from annoy import AnnoyIndex
+
+from index_schema import INGEST_SOURCE
+
+logger = logging.getLogger("voice-assistant")
+
+RAG_LOCAL_INDEX_DIR = os.getenv('RAG_LOCAL_INDEX_DIR', '/tmp/graham-ann')
+# Replicas older than this are re-synced in the background, the old one keeps serving
+RAG_LOCAL_INDEX_MAX_AGE = float(os.getenv('RAG_LOCAL_INDEX_MAX_AGE', '3600'))
+RAG_LOCAL_INDEX_TREES = int(os.getenv('RAG_LOCAL_INDEX_TREES', '10'))
+# How often a process checks whether another one replaced the files on disk
+RELOAD_CHECK_INTERVAL = 30.0
+FETCH_BATCH_SIZE = 100
+
+
+class _Replica:
+    """One generation of a replica mapped from disk.
+
+    Item metadata is a blob of JSON records with a table of their offsets, both
+    memory-mapped like the annoy file, so processes share the pages and only the
+    records a query returns are decoded.
+    """
+
+    def __init__(self, ann: AnnoyIndex, offsets_file, items_file, synced_at: float, mtime: float):
+        self.ann = ann
+        self.synced_at = synced_at
+        self.mtime = mtime
+        self._maps = [
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            for f in (offsets_file, items_file)
+            # an empty file can't be mapped, a replica of an empty namespace has no items
+            if os.fstat(f.fileno()).st_size
+        ]
+        self._offsets = memoryview(self._maps[0]).cast('Q')
+        self._items = self._maps[1] if len(self._maps) > 1 else b""
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def item(self, item_id: int) -> dict:
+        return json.loads(self._items[self._offsets[item_id]:self._offsets[item_id + 1]])
+
+    def close(self) -> None:
+        self.ann.unload()
+        self._offsets.release()
+        for mapped in self._maps:
+            mapped.close()
+
+
+class LocalAnnIndex:
+    """On-disk annoy replica of one Pinecone namespace.
+
+    The index and its metadata are memory-mapped, so every job process on the machine
+    shares the same pages. One process syncs at a time (file lock); the others pick
+    the new files up on their next reload check, mapped in the executor. A sync
+    writes a new generation of the annoy and metadata files, then renames the
+    manifest, so a reader never pairs the vectors of one sync with the metadata of
+    another.
+    """
+
+    def __init__(self, index_name: str, namespace: str, dimensions: int):
+        self.index_name = index_name
+        self.namespace = namespace
+        self.dimensions = dimensions
+
+        self._base = os.path.join(RAG_LOCAL_INDEX_DIR, f"{index_name}__{namespace or 'default'}")
+        # names the live generation, the files of a sync are switched in by renaming it
+        self._manifest_path = self._base + ".json"
+        self._lock_path = self._base + ".lock"
+
+        self._replica: Optional[_Replica] = None
+        self._last_reload_check = 0.0
+        self._load_task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._replica is not None
+
+    @property
+    def stale(self) -> bool:
+        synced_at = self._replica.synced_at if self._replica is not None else 0.0
+        return time.time() - synced_at > RAG_LOCAL_INDEX_MAX_AGE
+
+    async def load(self) -> bool:
+        """Map the replica from disk in the executor if it changed, returns whether one is usable."""
+        loop = asyncio.get_running_loop()
+        loaded_mtime = self._replica.mtime if self._replica is not None else None
+        replica = await loop.run_in_executor(None, self._open, loaded_mtime)
+        if replica is None:
+            return self._replica is not None
+
+        # a slower load of an older generation doesn't replace a newer one
+        if self._replica is not None and replica.mtime <= self._replica.mtime:
+            replica.close()
+            return True
+        if self._replica is not None:
+            self._replica.close()
+        self._replica = replica
+        logger.info(f"Loaded local index for {self.index_name}/{self.namespace} with {len(replica)} vectors")
+        return True
+
+    def ensure_fresh(self, pinecone_index) -> None:
+        """Start a reload check, and a background sync if the replica is cold or stale."""
+        now = time.monotonic()
+        if now - self._last_reload_check > RELOAD_CHECK_INTERVAL and (self._load_task is None or self._load_task.done()):
+            self._last_reload_check = now
+            self._load_task = asyncio.create_task(self.load())
+
+        if (self._replica is None or self.stale) and (self._sync_task is None or self._sync_task.done()):
+            self._sync_task = asyncio.create_task(self._sync_in_background(pinecone_index))
+
+    def query(self, vector: List[float], top_k: int, min_timestamp: Optional[float] = None) -> List[Tuple[float, dict]]:
+        """Nearest items as (cosine similarity, metadata), filtered on ``timestamp``
+        like the agent's Pinecone query, ingested chunks are exempt."""
+        replica = self._replica
+        if replica is None or not len(replica):
+            return []
+
+        # over-fetch so the timestamp filter still leaves top_k candidates
+        ids, distances = replica.ann.get_nns_by_vector(vector, top_k * 4, include_distances=True)
+        matches = []
+        for item_id, distance in zip(ids, distances):
+            metadata = replica.item(item_id)
+            if (
+                min_timestamp is not None
+                and metadata.get('timestamp', 0) < min_timestamp
+                and metadata.get('source') != INGEST_SOURCE
+            ):
+                continue
+            # annoy's angular distance is sqrt(2 - 2 cos)
+            matches.append((1 - distance * distance / 2, metadata))
+            if len(matches) == top_k:
+                break
+        return matches
+
+    async def _sync_in_background(self, pinecone_index) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.sync, pinecone_index)
+            await self.load()
+        except Exception as e:
+            logger.error(f"Error syncing local index for {self.index_name}: {str(e)}")
+
+    def sync(self, pinecone_index) -> bool:
+        """Copy the namespace from Pinecone into a new replica, blocking.
+
+        Returns False when another process holds the sync lock.
+        """
+        os.makedirs(RAG_LOCAL_INDEX_DIR, exist_ok=True)
+        with open(self._lock_path, 'w') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+
+            started = time.time()
+            # write a new generation next to the live one and switch the manifest over,
+            # readers keep their mapping of the old files
+            generation = str(int(started * 1000))
+            ann = AnnoyIndex(self.dimensions, 'angular')
+            # item i's metadata is items[offsets[i]:offsets[i + 1]]
+            offsets = array('Q', [0])
+            with open(self._generation_path(generation, ".items"), 'wb') as items:
+                pagination_token = None
+                while True:
+                    page = pinecone_index.list_paginated(
+                        namespace=self.namespace,
+                        limit=FETCH_BATCH_SIZE,
+                        pagination_token=pagination_token,
+                    )
+                    ids = [item.id for item in page.vectors]
+                    if ids:
+                        response = pinecone_index.fetch(ids=ids, namespace=self.namespace)
+                        for vector_id, vector in response.vectors.items():
+                            ann.add_item(len(offsets) - 1, vector.values)
+                            items.write(json.dumps({"id": vector_id, **(vector.metadata or {})}).encode())
+                            offsets.append(items.tell())
+
+                    pagination_token = page.pagination.next if page.pagination else None
+                    if not pagination_token:
+                        break
+
+            count = len(offsets) - 1
+            if count:
+                ann.build(RAG_LOCAL_INDEX_TREES)
+                ann.save(self._generation_path(generation, ".ann"))
+            with open(self._generation_path(generation, ".offsets"), 'wb') as f:
+                offsets.tofile(f)
+            with open(self._generation_path(generation, ".json"), 'w') as f:
+                json.dump({"dimensions": self.dimensions, "synced_at": started, "count": count}, f)
+            with open(self._manifest_path + ".tmp", 'w') as f:
+                json.dump({"generation": generation}, f)
+            os.replace(self._manifest_path + ".tmp", self._manifest_path)
+            self._remove_old_generations(keep=generation)
+
+            logger.info(f"Synced {count} vectors of {self.index_name}/{self.namespace} in {time.time() - started:.1f}s")
+            return True
+
+    def _open(self, loaded_mtime: Optional[float]) -> Optional[_Replica]:
+        """Map the live generation, blocking. None when it is the one already loaded or
+        can't be used, a generation removed mid-load is retried on the next check."""
+        try:
+            mtime = os.path.getmtime(self._manifest_path)
+            if mtime == loaded_mtime:
+                return None
+
+            with open(self._manifest_path) as f:
+                generation = json.load(f)["generation"]
+            with open(self._generation_path(generation, ".json")) as f:
+                meta = json.load(f)
+            if meta["dimensions"] != self.dimensions:
+                return None
+
+            ann = AnnoyIndex(self.dimensions, 'angular')
+            if meta["count"]:
+                ann.load(self._generation_path(generation, ".ann"))
+            if ann.get_n_items() != meta["count"]:
+                ann.unload()
+                return None
+            try:
+                with open(self._generation_path(generation, ".offsets"), 'rb') as offsets, \
+                        open(self._generation_path(generation, ".items"), 'rb') as items:
+                    replica = _Replica(ann, offsets, items, meta["synced_at"], mtime)
+            except (OSError, ValueError):
+                ann.unload()
+                return None
+            if len(replica) != meta["count"]:
+                replica.close()
+                return None
+            return replica
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _generation_path(self, generation: str, suffix: str) -> str:
+        return f"{self._base}.{generation}{suffix}"
+
+    def _remove_old_generations(self, keep: str) -> None:
+        # unlinking a mapped file is safe, a reader still loading one retries on its next check
+        for path in glob.glob(glob.escape(self._base) + ".*[0-9].*"):
+            generation = path[len(self._base) + 1:].rsplit(".", 1)[0]
+            if generation.isdigit() and generation != keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+_indexes: Dict[Tuple[str, str, int], LocalAnnIndex] = {}
+
+
+def get_local_index(index_name: str, namespace: str, dimensions: int) -> LocalAnnIndex:
+    key = (index_name, namespace, dimensions)
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = LocalAnnIndex(index_name, namespace, dimensions)
+    return index
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger("voice-assistant")
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up, a proxy for blocking work in the job.
+
+    Every ``interval`` seconds the monitor sleeps and records how much later than
+    requested it resumed. ``on_sample`` receives every lag sample in seconds.
+    """
+
+    def __init__(self, *, interval: float = 0.5, on_sample: Optional[Callable[[float], None]] = None):
+        self._interval = interval
+        self._on_sample = on_sample
+        self._task: Optional[asyncio.Task] = None
+
+        self.samples = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.samples if self.samples else 0.0
+
+    def summary(self) -> dict:
+        return {"samples": self.samples, "mean_ms": self.mean * 1000, "max_ms": self.max * 1000}
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self._interval)
+            lag = max(0.0, loop.time() - start - self._interval)
+
+            self.samples += 1
+            self.total += lag
+            self.max = max(self.max, lag)
+            if self._on_sample is not None:
+                try:
+                    self._on_sample(lag)
+                except Exception as e:
+                    logger.debug(f"Error reporting event loop lag: {str(e)}")
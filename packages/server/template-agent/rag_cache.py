@@ -0,0 +1,215 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+RAG_CACHE_MAX_ENTRIES = int(os.getenv('RAG_CACHE_MAX_ENTRIES', '1024'))
+RAG_CACHE_MAX_BYTES = int(os.getenv('RAG_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+# Results go stale as documents age out of the 30 day timestamp filter
+RAG_CACHE_TTL = float(os.getenv('RAG_CACHE_TTL', '900'))
+# Namespaces whose caches a process keeps, the least recently used one is dropped beyond this
+RAG_CACHE_MAX_NAMESPACES = int(os.getenv('RAG_CACHE_MAX_NAMESPACES', '16'))
+# Cosine similarity above which a cached query counts as a paraphrase
+RAG_SEMANTIC_THRESHOLD = float(os.getenv('RAG_SEMANTIC_THRESHOLD', '0.9'))
+RAG_SEMANTIC_MAX_ENTRIES = int(os.getenv('RAG_SEMANTIC_MAX_ENTRIES', '2048'))
+
+
+class RagCache:
+    """Size-bounded LRU cache with a TTL for knowledge base lookups.
+
+    Bounded by entry count and by the approximate memory of its keys and values.
+    """
+
+    def __init__(self, *, max_entries: int = RAG_CACHE_MAX_ENTRIES, max_bytes: int = RAG_CACHE_MAX_BYTES, ttl: float = RAG_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        # key -> (expires_at, value, size)
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, value, size)
+        self.bytes += size
+
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+
+class SemanticCache:
+    """Cache of results keyed by query embedding, answering paraphrases of earlier queries.
+
+    Embeddings are kept normalized in one contiguous matrix so a lookup is a single
+    matrix-vector product. The matrix grows by doubling up to ``max_entries`` rows,
+    after that the least recently used row is replaced.
+    """
+
+    def __init__(self, dimensions: int, *, max_entries: int = RAG_SEMANTIC_MAX_ENTRIES, threshold: float = RAG_SEMANTIC_THRESHOLD, ttl: float = RAG_CACHE_TTL):
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+
+        capacity = min(64, max_entries)
+        self._vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        self._expires_at = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._values: List[Optional[str]] = [None] * capacity
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def bytes(self) -> int:
+        return self._vectors.nbytes + self._expires_at.nbytes + self._last_used.nbytes + sum(
+            sys.getsizeof(value) for value in self._values[:self._size]
+        )
+
+    def get(self, embedding: Sequence[float]) -> Optional[str]:
+        if self._size == 0:
+            self.misses += 1
+            return None
+
+        now = time.monotonic()
+        scores = self._vectors[:self._size] @ _normalize(embedding)
+        scores[self._expires_at[:self._size] <= now] = -1.0
+
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        self._last_used[best] = now
+        self.hits += 1
+        return self._values[best]
+
+    def put(self, embedding: Sequence[float], value: str) -> None:
+        now = time.monotonic()
+        if self._size == len(self._values) and self._size < self.max_entries:
+            self._grow(min(self._size * 2, self.max_entries))
+
+        if self._size < len(self._values):
+            row = self._size
+            self._size += 1
+        else:
+            # expired rows first, then the least recently used one
+            expired = np.flatnonzero(self._expires_at <= now)
+            row = int(expired[0]) if len(expired) else int(np.argmin(self._last_used))
+
+        self._vectors[row] = _normalize(embedding)
+        self._expires_at[row] = now + self.ttl
+        self._last_used[row] = now
+        self._values[row] = value
+
+    def _grow(self, capacity: int) -> None:
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        self._vectors = vectors
+        self._expires_at = np.resize(self._expires_at, capacity)
+        self._last_used = np.resize(self._last_used, capacity)
+        self._values.extend([None] * (capacity - len(self._values)))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _normalize(embedding: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+# One cache per namespace, shared by every call handled by this process
+_caches: "OrderedDict[str, RagCache]" = OrderedDict()
+_semantic_caches: "OrderedDict[Tuple[str, int], SemanticCache]" = OrderedDict()
+
+
+def get_rag_cache(namespace: str) -> RagCache:
+    cache = _caches.get(namespace)
+    if cache is None:
+        cache = _caches[namespace] = RagCache()
+        if len(_caches) > RAG_CACHE_MAX_NAMESPACES:
+            _caches.popitem(last=False)
+    else:
+        _caches.move_to_end(namespace)
+    return cache
+
+
+def get_semantic_cache(namespace: str, dimensions: int) -> SemanticCache:
+    key = (namespace, dimensions)
+    cache = _semantic_caches.get(key)
+    if cache is None:
+        cache = _semantic_caches[key] = SemanticCache(dimensions)
+        if len(_semantic_caches) > RAG_CACHE_MAX_NAMESPACES:
+            _semantic_caches.popitem(last=False)
+    else:
+        _semantic_caches.move_to_end(key)
+    return cache
@@ -0,0 +1,219 @@
+import asyncio
+import dataclasses
+import logging
+import os
+import re
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from livekit.agents import stt, utils
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions
+
+logger = logging.getLogger("voice-assistant")
+
+# Words an interim transcript must share with the previous one before it is worth a lookup
+SPECULATIVE_RAG_MIN_WORDS = int(os.getenv('SPECULATIVE_RAG_MIN_WORDS', '4'))
+# Share of a tool query's words that must appear in a transcript to reuse its lookup
+SPECULATIVE_RAG_OVERLAP = float(os.getenv('SPECULATIVE_RAG_OVERLAP', '0.8'))
+# Lookups older than this many seconds are not reused, the knowledge base may have moved on
+SPECULATIVE_RAG_MAX_AGE = float(os.getenv('SPECULATIVE_RAG_MAX_AGE', '30'))
+SPECULATIVE_RAG_HISTORY = 4
+
+_STOPWORDS = {
+    "the", "and", "for", "are", "you", "your", "what", "how", "can", "does", "about",
+    "with", "that", "this", "have", "has", "our", "their", "there", "from", "tell",
+}
+
+
+class TranscriptTapSTT(stt.STT):
+    def __init__(self, wrapped: stt.STT, *, on_event: Callable[[stt.SpeechEvent], None]) -> None:
+        """
+        Pass-through STT that shows every speech event of its streams to ``on_event``
+        before the pipeline sees it, interim transcripts included.
+        """
+        super().__init__(capabilities=wrapped.capabilities)
+        self._wrapped = wrapped
+        self._on_event = on_event
+
+        @self._wrapped.on("metrics_collected")
+        def _forward_metrics(*args, **kwargs):
+            self.emit("metrics_collected", *args, **kwargs)
+
+    @property
+    def wrapped_stt(self) -> stt.STT:
+        return self._wrapped
+
+    async def _recognize_impl(
+        self,
+        buffer: utils.AudioBuffer,
+        *,
+        language: str | None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ):
+        return await self._wrapped.recognize(buffer=buffer, language=language, conn_options=conn_options)
+
+    def stream(
+        self,
+        *,
+        language: str | None = None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> stt.RecognizeStream:
+        return TranscriptTapStream(self, language=language, conn_options=conn_options)
+
+    async def aclose(self) -> None:
+        await self._wrapped.aclose()
+
+
+class TranscriptTapStream(stt.RecognizeStream):
+    def __init__(self, tap: TranscriptTapSTT, *, language: str | None, conn_options: APIConnectOptions) -> None:
+        self._tap = tap
+        self._wrapped_stream = tap.wrapped_stt.stream(language=language, conn_options=conn_options)
+        # the wrapped stream retries on its own
+        super().__init__(stt=tap, conn_options=dataclasses.replace(conn_options, max_retry=0))
+
+    async def _metrics_monitor_task(self, event_aiter) -> None:
+        # the wrapped stream reports metrics, the tee still has to be drained or it buffers every event
+        async for _ in event_aiter:
+            pass
+
+    async def _run(self) -> None:
+        async def _forward_input():
+            async for frame in self._input_ch:
+                if isinstance(frame, self._FlushSentinel):
+                    self._wrapped_stream.flush()
+                else:
+                    self._wrapped_stream.push_frame(frame)
+            self._wrapped_stream.end_input()
+
+        async def _forward_events():
+            async for ev in self._wrapped_stream:
+                try:
+                    self._tap._on_event(ev)
+                except Exception as e:
+                    logger.error(f"Error in transcript tap: {str(e)}")
+                self._event_ch.send_nowait(ev)
+
+        tasks = [
+            asyncio.create_task(_forward_input(), name="forward_input"),
+            asyncio.create_task(_forward_events(), name="forward_events"),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await utils.aio.gracefully_cancel(*tasks)
+            await self._wrapped_stream.aclose()
+
+
+class SpeculativeRetriever:
+    """Starts knowledge base lookups from the caller's transcript while they are still talking.
+
+    Lookups go through ``rag_agent.query_knowledge`` so their results land in the RAG
+    caches. A later tool call whose query is mostly made of words from a lookup's
+    transcript reuses that lookup directly, in flight or finished, as long as it was
+    started in the current or the previous utterance, within SPECULATIVE_RAG_MAX_AGE,
+    and the final transcript of its utterance kept every word it was started with.
+    """
+
+    def __init__(self, rag_agent, *, min_words: int = SPECULATIVE_RAG_MIN_WORDS):
+        self._rag_agent = rag_agent
+        self._min_words = min_words
+
+        self._utterance: List[str] = []
+        # numbers the caller's utterances, lookups remember the one they were started in
+        self._utterance_index = 0
+        # content words of the final transcript so far, of the current and previous utterance
+        self._final_words: Dict[int, Set[str]] = {}
+        self._previous_interim: List[str] = []
+        self._last_text = ''
+        self._pending: Optional[Tuple[str, int]] = None
+        self._running: Optional[asyncio.Task] = None
+        # (utterance, started at, transcript words, task)
+        self._lookups: Deque[Tuple[int, float, Set[str], asyncio.Task]] = deque(maxlen=SPECULATIVE_RAG_HISTORY)
+
+        self.started = 0
+        self.reused = 0
+
+    def on_speech_event(self, ev: stt.SpeechEvent) -> None:
+        if ev.type == stt.SpeechEventType.END_OF_SPEECH:
+            self._utterance = []
+            self._previous_interim = []
+            self._utterance_index += 1
+            self._final_words.pop(self._utterance_index - 2, None)
+            return
+
+        if ev.type not in (stt.SpeechEventType.INTERIM_TRANSCRIPT, stt.SpeechEventType.FINAL_TRANSCRIPT):
+            return
+        if not ev.alternatives or not ev.alternatives[0].text:
+            return
+
+        words = ev.alternatives[0].text.split()
+        if ev.type == stt.SpeechEventType.FINAL_TRANSCRIPT:
+            self._utterance.extend(words)
+            self._previous_interim = []
+            self._final_words[self._utterance_index] = _content_words(" ".join(self._utterance))
+            self._speculate(" ".join(self._utterance))
+            return
+
+        # interim words that survived a revision are unlikely to change again
+        stable = []
+        for previous, current in zip(self._previous_interim, words):
+            if previous != current:
+                break
+            stable.append(current)
+        self._previous_interim = words
+        if len(stable) >= self._min_words:
+            self._speculate(" ".join(self._utterance + stable))
+
+    async def lookup(self, query: str) -> Optional[str]:
+        """Result of a speculative lookup covering ``query``, None when there isn't one."""
+        words = _content_words(query)
+        if not words:
+            return None
+
+        now = time.monotonic()
+        for utterance, started_at, transcript_words, task in reversed(self._lookups):
+            if utterance < self._utterance_index - 1 or now - started_at > SPECULATIVE_RAG_MAX_AGE:
+                continue
+            # a lookup started from interim words the final transcript revised answers another question
+            if not transcript_words <= self._final_words.get(utterance, set()):
+                continue
+            if len(words & transcript_words) >= SPECULATIVE_RAG_OVERLAP * len(words):
+                result = await asyncio.shield(task)
+                if result:
+                    self.reused += 1
+                    return result
+        return None
+
+    def stats(self) -> dict:
+        return {"started": self.started, "reused": self.reused}
+
+    def _speculate(self, text: str, utterance: Optional[int] = None) -> None:
+        if text == self._last_text:
+            return
+        self._last_text = text
+        if utterance is None:
+            utterance = self._utterance_index
+
+        # one lookup at a time per call, only the newest waiting transcript runs next
+        if self._running is not None and not self._running.done():
+            self._pending = (text, utterance)
+            return
+
+        self.started += 1
+        self._running = asyncio.create_task(self._rag_agent.query_knowledge(text))
+        self._running.add_done_callback(self._on_lookup_done)
+        self._lookups.append((utterance, time.monotonic(), _content_words(text), self._running))
+
+    def _on_lookup_done(self, _: asyncio.Task) -> None:
+        if self._pending is not None:
+            (text, utterance), self._pending = self._pending, None
+            self._last_text = ''
+            self._speculate(text, utterance)
+
+
+def _content_words(text: str) -> Set[str]:
+    return {
+        word for word in re.findall(r"[a-z0-9']+", text.lower())
+        if len(word) > 2 and word not in _STOPWORDS
+    }
@@ -0,0 +1,8 @@
+import os
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# template-agent is run as a directory of scripts, not a package
+sys.path.insert(0, os.path.join(SERVER_DIR, "template-agent"))
+sys.path.insert(0, SERVER_DIR)
@@ -0,0 +1,143 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+import pytest
+
+import calendar_credentials
+from calendar_credentials import get_calendar_credentials
+from fake_providers import Behavior, FakeProviders
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    """Serve the fakes for one test and point the credential manager at them."""
+
+    async def start(expires_in: float, **env):
+        providers = FakeProviders(behaviors={"google_calendar": Behavior(latency=0.05), "graham_api": Behavior(latency=0)})
+        await providers.start()
+        urls = providers.urls
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+
+        monkeypatch.setattr(calendar_credentials, "GOOGLE_OAUTH_TOKEN_URI", f"{urls['google_calendar']}/token")
+        monkeypatch.setattr(calendar_credentials, "GRAHAM_API_URL", urls["graham_api"])
+        monkeypatch.setattr(calendar_credentials, "GRAHAM_API_KEY", env.pop("api_key", "fake"))
+        for name, value in env.items():
+            monkeypatch.setattr(calendar_credentials, name, value)
+        for key, value in {
+            "GOOGLE_CALENDAR_ENABLED": "true",
+            "GOOGLE_CALENDAR_ACCESS_TOKEN": "initial-access",
+            "GOOGLE_CALENDAR_REFRESH_TOKEN": "fake-refresh",
+            "GOOGLE_CALENDAR_EXPIRES_AT": expires_at.isoformat(),
+            "GOOGLE_CLIENT_ID": "fake",
+            "GOOGLE_CLIENT_SECRET": "fake",
+        }.items():
+            monkeypatch.setenv(key, value)
+        return providers
+
+    monkeypatch.setattr(calendar_credentials, "_credentials", {})
+    return start
+
+
+async def _get_json(url: str) -> dict:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            return json.loads(await response.text())
+
+
+async def _token_requests(providers: FakeProviders) -> int:
+    stats = await _get_json(f"{providers.urls['google_calendar']}/_fake/stats")
+    return stats["requests"].get("/token", 0)
+
+
+def test_refreshes_ahead_of_expiry_and_writes_back(fakes):
+    async def run():
+        # outside google-auth's expiry threshold, so nothing is refreshed on the caller's path
+        providers = await fakes(300, CALENDAR_TOKEN_REFRESH_MARGIN=299.5)
+        manager = get_calendar_credentials("agent-1", "user-1")
+        try:
+            creds = await manager.get()
+            assert creds.token == "initial-access"
+            assert await _token_requests(providers) == 0
+
+            await asyncio.sleep(1.5)
+            assert creds.token.startswith("fake-access-")
+            assert creds.expiry > datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(minutes=50)
+            assert await manager.get() is creds
+
+            stored = await _get_json(f"{providers.urls['graham_api']}/api/calendar/tokens/agent-1/user-1")
+            assert stored["accessToken"] == creds.token
+            assert stored["refreshToken"] == "fake-refresh"
+            assert stored["expiresAt"] == creds.expiry.isoformat()
+        finally:
+            await manager.aclose()
+            await providers.aclose()
+
+    asyncio.run(run())
+
+
+def test_concurrent_callers_share_one_refresh_of_an_expired_token(fakes):
+    async def run():
+        providers = await fakes(-60)
+        manager = get_calendar_credentials("agent-1", "user-1")
+        try:
+            results = await asyncio.gather(*(manager.get() for _ in range(5)))
+            assert all(creds is results[0] for creds in results)
+            assert results[0].token.startswith("fake-access-")
+            assert not results[0].expired
+            assert await _token_requests(providers) == 1
+        finally:
+            await manager.aclose()
+            await providers.aclose()
+
+    asyncio.run(run())
+
+
+def test_failed_write_back_keeps_the_refreshed_token(fakes):
+    async def run():
+        providers = await fakes(-60, api_key="wrong")
+        manager = get_calendar_credentials("agent-1", "user-1")
+        try:
+            creds = await manager.get()
+            assert creds.token.startswith("fake-access-")
+            status = await _get_json(f"{providers.urls['graham_api']}/api/calendar/tokens/agent-1/user-1")
+            assert status == {"error": "Not Found"}
+        finally:
+            await manager.aclose()
+            await providers.aclose()
+
+    asyncio.run(run())
+
+
+def test_timezone_aware_expiry_is_normalized(fakes):
+    async def run():
+        providers = await fakes(3600)
+        manager = get_calendar_credentials("agent-1", "user-1")
+        try:
+            creds = await manager.get()
+            assert creds.expiry.tzinfo is None
+            assert 3500 < manager._refresh_delay() + calendar_credentials.CALENDAR_TOKEN_REFRESH_MARGIN <= 3600
+            assert not manager._refresh_task.done()
+        finally:
+            await manager.aclose()
+            await providers.aclose()
+
+    asyncio.run(run())
+
+
+def test_idle_managers_are_pruned(fakes):
+    async def run():
+        providers = await fakes(3600, CALENDAR_CREDENTIALS_IDLE=0.1)
+        idle = get_calendar_credentials("agent-1", "user-1")
+        try:
+            await idle.get()
+            await asyncio.sleep(0.2)
+            get_calendar_credentials("agent-2", "user-2")
+            assert ("agent-1", "user-1") not in calendar_credentials._credentials
+            await asyncio.sleep(0)
+            assert idle._refresh_task.cancelled()
+        finally:
+            await providers.aclose()
+
+    asyncio.run(run())
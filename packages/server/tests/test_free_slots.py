@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from calendar_cache import free_slots
+
+TZ = timezone(timedelta(hours=-5))
+HOUR = timedelta(hours=1)
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 10, 20, hour, minute, tzinfo=TZ)
+
+
+def times(slots):
+    return [(start.strftime("%H:%M"), end.strftime("%H:%M")) for start, end in slots]
+
+
+def test_empty_day_is_filled_back_to_back():
+    assert times(free_slots([], at(9), at(12), HOUR)) == [("09:00", "10:00"), ("10:00", "11:00"), ("11:00", "12:00")]
+
+
+def test_gaps_between_busy_intervals():
+    busy = [(at(10), at(11)), (at(13), at(14))]
+    assert times(free_slots(busy, at(9), at(15), HOUR)) == [
+        ("09:00", "10:00"), ("11:00", "12:00"), ("12:00", "13:00"), ("14:00", "15:00"),
+    ]
+
+
+def test_overlapping_and_nested_busy_intervals_are_merged():
+    busy = [(at(9, 30), at(12)), (at(10), at(11)), (at(11, 30), at(13))]
+    assert times(free_slots(busy, at(9), at(15), HOUR)) == [("13:00", "14:00"), ("14:00", "15:00")]
+
+
+def test_busy_time_outside_opening_hours():
+    busy = [(at(7), at(9, 10)), (at(16, 30), at(19))]
+    assert times(free_slots(busy, at(9), at(17), HOUR)) == [
+        ("09:15", "10:15"), ("10:15", "11:15"), ("11:15", "12:15"),
+        ("12:15", "13:15"), ("13:15", "14:15"), ("14:15", "15:15"), ("15:15", "16:15"),
+    ]
+
+
+def test_gap_shorter_than_duration_is_skipped():
+    busy = [(at(9), at(9, 40)), (at(10), at(12))]
+    assert times(free_slots(busy, at(9), at(13), HOUR)) == [("12:00", "13:00")]
+
+
+def test_slot_starts_are_rounded_up_to_the_step():
+    busy = [(at(9), at(9, 5))]
+    assert times(free_slots(busy, at(9), at(10), timedelta(minutes=30))) == [("09:15", "09:45")]
+
+
+def test_fully_booked_day_has_no_slots():
+    assert free_slots([(at(8), at(18))], at(9), at(17), HOUR) == []
+
+
+def test_duration_longer_than_opening_hours():
+    assert free_slots([], at(9), at(10), 2 * HOUR) == []
+
+
+@pytest.mark.parametrize("duration", [timedelta(0), -HOUR])
+def test_non_positive_duration_is_rejected(duration):
+    with pytest.raises(ValueError):
+        free_slots([], at(9), at(17), duration)
+
+
+def test_non_positive_step_is_rejected():
+    with pytest.raises(ValueError):
+        free_slots([], at(9), at(17), HOUR, step=timedelta(0))
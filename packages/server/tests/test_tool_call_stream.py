@@ -0,0 +1,155 @@
+import asyncio
+from types import SimpleNamespace
+
+from livekit.agents import llm
+
+from custom_plugins.cerebras_plugin.llm import LLM, LLMStream, _ToolCallState
+
+
+def fragment(index, arguments=None, *, id=None, name=None):
+    return SimpleNamespace(index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def chunk(*tool_calls, finish_reason=None):
+    delta = SimpleNamespace(content=None, tool_calls=list(tool_calls))
+    return SimpleNamespace(id="req", usage=None, choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+def function_context():
+    fnc_ctx = llm.FunctionContext()
+
+    @fnc_ctx.ai_callable(description="Look up the weather")
+    async def get_weather(city: str, days: int = 1):
+        return f"{city} {days}"
+
+    @fnc_ctx.ai_callable(description="Query knowledge base")
+    async def query_knowledge(query: str):
+        return query
+
+    @fnc_ctx.ai_callable(description="Current time")
+    async def get_time():
+        return "noon"
+
+    return fnc_ctx
+
+
+def open_stream(chunks):
+    async def _cerebras_stream():
+        for c in chunks:
+            yield c
+
+    async def _open():
+        return _cerebras_stream()
+
+    return LLMStream(
+        LLM(api_key="fake", client=object()),
+        cerebras_stream=_open(),
+        chat_ctx=llm.ChatContext(),
+        fnc_ctx=function_context(),
+        conn_options=llm.llm.DEFAULT_API_CONNECT_OPTIONS,
+    )
+
+
+def stream_calls(chunks):
+    """(tool call id, function name, arguments) of every call the stream emits for ``chunks``."""
+
+    async def _run():
+        calls = []
+        async with open_stream(chunks) as stream:
+            async for chat_chunk in stream:
+                for choice in chat_chunk.choices:
+                    for call in choice.delta.tool_calls or []:
+                        calls.append((call.tool_call_id, call.function_info.name, call.arguments))
+        return calls
+
+    return asyncio.run(_run())
+
+
+def parsed_calls(chunks):
+    """Names of the calls each chunk completes, fed to the stream's parser one at a time."""
+
+    async def _run():
+        async with open_stream([]) as stream:
+            async for _ in stream:
+                pass
+
+        names = []
+        for c in chunks:
+            chat_chunk = stream._parse_chunk(c)
+            calls = chat_chunk.choices[0].delta.tool_calls if chat_chunk is not None else None
+            names.append([call.function_info.name for call in calls or []])
+        return names
+
+    return asyncio.run(_run())
+
+
+def test_feed_closes_only_at_the_outer_brace():
+    state = _ToolCallState()
+    for part in ['{"query": "a {b', '} [c]", "n": {"x"', ": [1, 2]", "}}"]:
+        assert not state.closed
+        state.feed(part)
+    assert state.closed
+    assert state.raw_arguments == '{"query": "a {b} [c]", "n": {"x": [1, 2]}}'
+
+
+def test_feed_ignores_escaped_quotes_in_strings():
+    state = _ToolCallState()
+    state.feed('{"query": "say \\"}\\" ')
+    assert not state.closed
+    state.feed('now"}')
+    assert state.closed
+
+
+def test_arguments_split_across_chunks_are_assembled():
+    calls = stream_calls([
+        chunk(fragment(0, id="call_1", name="get_weather")),
+        chunk(fragment(0, '{"ci')),
+        chunk(fragment(0, 'ty": "Pa')),
+        chunk(fragment(0, 'ris", "days": 3}')),
+        chunk(finish_reason="tool_calls"),
+    ])
+    assert calls == [("call_1", "get_weather", {"city": "Paris", "days": 3})]
+
+
+def test_call_is_dispatched_as_soon_as_its_arguments_close():
+    names = parsed_calls([
+        chunk(fragment(0, '{"query": "hours"', id="call_1", name="query_knowledge")),
+        chunk(fragment(0, "}")),
+        chunk(fragment(1, '{"city": "Oslo"}', id="call_2", name="get_weather")),
+        chunk(finish_reason="tool_calls"),
+    ])
+    assert names == [[], ["query_knowledge"], ["get_weather"], []]
+
+
+def test_interleaved_indices_are_kept_apart():
+    calls = stream_calls([
+        chunk(fragment(0, id="call_a", name="get_weather"), fragment(1, id="call_b", name="query_knowledge")),
+        chunk(fragment(1, '{"query": ')),
+        chunk(fragment(0, '{"city": ')),
+        chunk(fragment(0, '"Rome"'), fragment(1, '"menu"')),
+        chunk(fragment(1, "}")),
+        chunk(fragment(0, "}")),
+        chunk(finish_reason="tool_calls"),
+    ])
+    assert calls == [
+        ("call_b", "query_knowledge", {"query": "menu"}),
+        ("call_a", "get_weather", {"city": "Rome"}),
+    ]
+
+
+def test_missing_index_falls_back_to_the_call_id():
+    calls = stream_calls([
+        chunk(fragment(None, '{"query"', id="call_1", name="query_knowledge")),
+        chunk(fragment(None, ': "parking"}', id="call_1")),
+        chunk(finish_reason="tool_calls"),
+    ])
+    assert calls == [("call_1", "query_knowledge", {"query": "parking"})]
+
+
+def test_parsed_and_argumentless_calls_are_dispatched():
+    calls = stream_calls([
+        chunk(fragment(0, {"city": "Lima"}, id="call_1", name="get_weather")),
+        chunk(fragment(1, id="call_2", name="get_time")),
+    ])
+    # the API parsed call is complete on arrival, the other one only when the stream ends
+    assert calls == [("call_1", "get_weather", {"city": "Lima"}), ("call_2", "get_time", {})]